@@ -0,0 +1,94 @@
+"""Full-text search benchmark: FTS5 `search_tickets` vs a `LIKE '%...%'` scan.
+
+Bulk-loads a synthetic ticket corpus (a few common complaint templates plus a long tail of
+merchant / product words) into a throwaway database, then times complaint-style queries
+both ways, printing per-query latency. LIKE cost grows with table size (it can stop early
+only when matches are dense), FTS cost with the number of matching rows it has to rank.
+
+Usage (from repo root):
+    PYTHONPATH=. python benchmarks/bench_search.py --tickets 500000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator
+
+from src.main import support_store
+
+SUBJECTS = ["debit card", "credit card", "account", "transfer", "loan", "mortgage", "app", "statement"]
+PROBLEMS = [
+    "replacement has not arrived",
+    "was declined at the shop",
+    "is locked after a password reset",
+    "shows a duplicate charge",
+    "is taking too long to process",
+    "needs a new PIN",
+    "was charged a fee twice",
+    "cannot be opened on my phone",
+]
+FILLER = [
+    "Please help as soon as possible.",
+    "I have been a customer for years.",
+    "This is the second time I am writing.",
+    "Thanks in advance.",
+    "",
+]
+VOCABULARY_SIZE = 20_000
+QUERIES = ["debit card replacement", "duplicate charge", "password reset locked", "w1234", "w4321 w17", "statement w42 fee"]
+
+
+def synthetic_tickets(count: int, seed: int = 7) -> Iterator[tuple[str, str, str, str]]:
+    rng = random.Random(seed)
+    for i in range(count):
+        # Zipf-ish long tail: a few words are common, most are rare.
+        tail = " ".join(f"w{int(rng.paretovariate(1.0)) % VOCABULARY_SIZE}" for _ in range(rng.randint(3, 12)))
+        message = f"My {rng.choice(SUBJECTS)} {rng.choice(PROBLEMS)}. {tail}. {rng.choice(FILLER)}"
+        yield (f"T{i:09d}", rng.choice(["Unresolved", "Resolved"]), message, f"Customer {i % 5000}")
+
+
+def like_search(query: str, limit: int) -> list[tuple]:
+    """Baseline: newest tickets containing every word as a substring (full table scan)."""
+    words = query.split()
+    where = " AND ".join("message LIKE ?" for _ in words)
+    return support_store._connection().execute(
+        f"SELECT {support_store._TICKET_COLUMNS} FROM support_tickets WHERE {where} ORDER BY id DESC LIMIT ?",
+        (*(f"%{word}%" for word in words), limit),
+    ).fetchall()
+
+
+def time_query(search, query: str, repeat: int, limit: int) -> float:
+    """Mean seconds per call over `repeat` calls."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        search(query, limit)
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        support_store.DB_PATH = Path(tmp) / "bench.db"
+        stats = support_store.import_tickets(synthetic_tickets(args.tickets))
+        print(f"loaded {stats.rows} tickets in {stats.seconds:.1f}s (incl. FTS rebuild)")
+        print(f"{'query':<24} {'matches':>8} {'LIKE ms':>9} {'FTS5 ms':>9} {'speed-up':>9}")
+        for query in QUERIES:
+            matches = len(support_store.search_tickets(query, support_store.MAX_PAGE_SIZE))
+            like = time_query(like_search, query, args.repeat, args.limit)
+            fts = time_query(support_store.search_tickets, query, args.repeat, args.limit)
+            shown = f"{matches}+" if matches == support_store.MAX_PAGE_SIZE else str(matches)
+            print(f"{query:<24} {shown:>8} {like * 1000:>9.2f} {fts * 1000:>9.2f} {like / fts:>8.1f}x")
+        support_store.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Concurrency benchmark for the SQLite ticket store.
+
+Runs a mixed create_ticket / get_ticket_status workload across 1..N worker threads
+against a throwaway database, once with SQLite defaults (rollback journal, full sync)
+and once with the tuned `support_store.PRAGMAS`, and prints reads/sec and writes/sec.
+
+Usage (from repo root):
+    PYTHONPATH=. python benchmarks/bench_support_store.py --ops 2000 --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from src.main import support_store
+
+DEFAULT_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL", "busy_timeout": support_store.BUSY_TIMEOUT_MS}
+
+
+def run_workload(db_path: Path, workers: int, ops_per_worker: int, write_ratio: float) -> tuple[float, float, int]:
+    """Return (reads/sec, writes/sec, errors) for one configuration."""
+    support_store.DB_PATH = db_path
+    support_store.init_db()
+    seed = [f"{100000 + i}" for i in range(1000)]
+    for number in seed:
+        support_store.create_ticket(number, "seed message")
+
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(workers + 1)
+
+    def worker(worker_id: int) -> None:
+        rng = random.Random(worker_id)
+        reads = writes = errors = 0
+        barrier.wait()
+        for i in range(ops_per_worker):
+            try:
+                if rng.random() < write_ratio:
+                    support_store.create_ticket(f"w{worker_id}-{i}", "benchmark message", customer_name="Bench")
+                    writes += 1
+                else:
+                    support_store.get_ticket_status(rng.choice(seed))
+                    reads += 1
+            except Exception:
+                errors += 1
+        with lock:
+            counts["reads"] += reads
+            counts["writes"] += writes
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(workers)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    support_store.close_connections()
+    return counts["reads"] / elapsed, counts["writes"] / elapsed, counts["errors"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=2000, help="operations per worker")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    # Measure SQLite itself, not the in-process status cache.
+    support_store.configure_status_cache(max_entries=0)
+    tuned = dict(support_store.PRAGMAS)
+    print(f"{'pragmas':<8} {'workers':>7} {'reads/s':>10} {'writes/s':>10} {'errors':>7}")
+    for label, pragmas in (("default", DEFAULT_PRAGMAS), ("tuned", tuned)):
+        support_store.PRAGMAS = pragmas
+        for workers in args.workers:
+            with tempfile.TemporaryDirectory() as tmp:
+                reads, writes, errors = run_workload(
+                    Path(tmp) / "bench.db", workers, args.ops, args.write_ratio
+                )
+            print(f"{label:<8} {workers:>7} {reads:>10.0f} {writes:>10.0f} {errors:>7}")
+    support_store.PRAGMAS = tuned
+
+
+if __name__ == "__main__":
+    main()
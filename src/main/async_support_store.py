@@ -0,0 +1,164 @@
+"""Asyncio front-end for the SQLite ticket store.
+
+All database work runs on one dedicated thread fed by a request queue, so coroutines
+never block the event loop on sqlite3 and every write goes through a single connection.
+The DB thread drains whatever has queued up since its last pass and handles it in
+submission order, committing consecutive `create_ticket` calls together in one transaction.
+
+    store = get_async_ticket_store()
+    number = await store.allocate_ticket_number()
+    await store.create_ticket(number, "Card not delivered", customer_name="Ana")
+    status = await store.get_ticket_status(number)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from src.main import support_store
+
+# Max requests handled per DB-thread pass; bounds how long one batch holds the write lock.
+DEFAULT_MAX_BATCH = 256
+
+
+@dataclass
+class _Request:
+    op: str
+    args: tuple
+    future: asyncio.Future = field(repr=False)
+    loop: asyncio.AbstractEventLoop = field(repr=False)
+
+
+class AsyncTicketStore:
+    """Awaitable ticket-store operations served by a single DB thread."""
+
+    def __init__(self, *, max_batch: int = DEFAULT_MAX_BATCH):
+        self.max_batch = max_batch
+        self._requests: queue.SimpleQueue[Optional[_Request]] = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="async-ticket-store", daemon=True)
+        self._thread.start()
+
+    async def create_ticket(
+        self,
+        ticket_number: str,
+        message: str,
+        status: str = "Unresolved",
+        customer_name: Optional[str] = None,
+    ) -> None:
+        await self._submit("create_ticket", (ticket_number, status, message, customer_name))
+
+    async def get_ticket_status(self, ticket_number: str) -> Optional[tuple[str, Optional[str]]]:
+        return await self._submit("get_ticket_status", (ticket_number,))
+
+    async def update_ticket_status(self, ticket_number: str, status: str) -> bool:
+        return await self._submit("update_ticket_status", (ticket_number, status))
+
+    async def allocate_ticket_number(self) -> str:
+        return await self._submit("allocate_ticket_number", ())
+
+    async def close(self) -> None:
+        """Finish queued requests and stop the DB thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._requests.put(None)
+        await asyncio.to_thread(self._thread.join)
+
+    def _submit(self, op: str, args: tuple) -> asyncio.Future:
+        if self._closed:
+            raise RuntimeError("AsyncTicketStore is closed.")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._requests.put(_Request(op, args, future, loop))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            first = self._requests.get()
+            if first is None:
+                return
+            batch = [first]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    request = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch: list[_Request]) -> None:
+        """Run requests in submission order; each run of consecutive creates shares one transaction."""
+        start = 0
+        while start < len(batch):
+            if batch[start].op != "create_ticket":
+                self._run_one(batch[start])
+                start += 1
+                continue
+            end = start
+            while end < len(batch) and batch[end].op == "create_ticket":
+                end += 1
+            self._create_many(batch[start:end])
+            start = end
+
+    def _create_many(self, creates: list[_Request]) -> None:
+        try:
+            errors = support_store.create_tickets([request.args for request in creates])
+        except BaseException as exc:
+            for request in creates:
+                _resolve(request, exc=exc)
+        else:
+            for request, error in zip(creates, errors):
+                _resolve(request, exc=error)
+
+    def _run_one(self, request: _Request) -> None:
+        try:
+            result = _OPERATIONS[request.op](*request.args)
+        except BaseException as exc:
+            _resolve(request, exc=exc)
+        else:
+            _resolve(request, result=result)
+
+
+_OPERATIONS: dict[str, Callable[..., Any]] = {
+    "get_ticket_status": support_store.get_ticket_status,
+    "update_ticket_status": support_store.update_ticket_status,
+    "allocate_ticket_number": support_store.allocate_ticket_number,
+}
+
+_default_store: Optional[AsyncTicketStore] = None
+_default_lock = threading.Lock()
+
+
+def get_async_ticket_store() -> AsyncTicketStore:
+    """Return the process-wide `AsyncTicketStore`, starting it on first use (or after close)."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None or _default_store._closed:
+            _default_store = AsyncTicketStore()
+        return _default_store
+
+
+def _resolve(request: _Request, *, result: Any = None, exc: Optional[BaseException] = None) -> None:
+    def _set() -> None:
+        if request.future.done():  # caller was cancelled
+            return
+        if exc is not None:
+            request.future.set_exception(exc)
+        else:
+            request.future.set_result(result)
+
+    try:
+        request.loop.call_soon_threadsafe(_set)
+    except RuntimeError:  # event loop already closed; nobody is waiting
+        pass
@@ -0,0 +1,190 @@
+"""Offline triage through the OpenAI Batch API file format.
+
+Flow for nightly re-triage:
+- `write_batch_requests` streams a JSONL input file into a Batch API request file.
+- `submit_batch` uploads it to OpenAI, or `run_local_batch` executes it directly as a local stand-in.
+- `download_batch_results` fetches the finished batch's output and error files as one result file.
+- `parse_batch_results` turns the result file into `ClassificationResult`s keyed by trace_id.
+
+Each request uses the single-call triage prompt, so the label, rationale, customer name and
+ticket number all come back from one completion.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.main.classifier import (
+    DEFAULT_MODEL,
+    ClassificationResult,
+    triage_request_body,
+    triage_result_from_content,
+)
+from src.main.jsonl import read_jsonl
+from src.main.openai_client_factory import get_openai_client
+from src.main.rate_limiter import limited_completion
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+# Batch statuses after which no (further) results will ever arrive.
+FAILED_BATCH_STATUSES = ("failed", "expired", "cancelled")
+
+
+class BatchFailedError(RuntimeError):
+    """Raised when a batch ended as failed, expired or cancelled instead of completing."""
+
+
+def write_batch_requests(
+    input_path: str | Path,
+    output_path: str | Path,
+    *,
+    model: str = DEFAULT_MODEL,
+    text_field: str = "message",
+    id_field: str = "trace_id",
+) -> int:
+    """Write a Batch API request file from a JSONL input; return the number of requests.
+
+    Records without text are skipped. Records without an id get `line-<n>` so every
+    request has a unique `custom_id` (the trace_id used when parsing results).
+    """
+    count = 0
+    seen: set[str] = set()
+    with open(output_path, "w", encoding="utf-8") as out:
+        for line_no, record in enumerate(read_jsonl(input_path), start=1):
+            text = str(record.get(text_field) or "").strip()
+            if not text:
+                continue
+            custom_id = str(record.get(id_field) or f"line-{line_no}")
+            if custom_id in seen:
+                raise ValueError(f"Duplicate {id_field} in batch input: {custom_id}")
+            seen.add(custom_id)
+            request = {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": CHAT_COMPLETIONS_URL,
+                "body": triage_request_body(text, model=model),
+            }
+            out.write(json.dumps(request) + "\n")
+            count += 1
+    return count
+
+
+def submit_batch(request_path: str | Path, *, client=None, completion_window: str = "24h") -> str:
+    """Upload a request file and create a Batch job; return the batch id."""
+    client = client or get_openai_client()
+    with open(request_path, "rb") as fh:
+        uploaded = client.files.create(file=fh, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint=CHAT_COMPLETIONS_URL,
+        completion_window=completion_window,
+    )
+    return batch.id
+
+
+def download_batch_results(batch_id: str, result_path: str | Path, *, client=None) -> bool:
+    """Write a completed batch's results to `result_path`; return False while it is still running.
+
+    The output file (successful requests) and error file (failed ones) are merged, so every
+    request's custom_id appears and failures parse to QUERY. Raises `BatchFailedError` if
+    the batch failed, expired or was cancelled, after writing any partial results.
+    """
+    client = client or get_openai_client()
+    batch = client.batches.retrieve(batch_id)
+    if batch.status != "completed" and batch.status not in FAILED_BATCH_STATUSES:
+        return False
+    file_ids = [file_id for file_id in (batch.output_file_id, batch.error_file_id) if file_id]
+    with open(result_path, "wb") as out:
+        for file_id in file_ids:
+            content = client.files.content(file_id).read()
+            out.write(content)
+            if content and not content.endswith(b"\n"):
+                out.write(b"\n")
+    if batch.status != "completed":
+        partial = f"; partial results written to {result_path}" if file_ids else ""
+        raise BatchFailedError(f"Batch {batch_id} {batch.status}{_batch_error_summary(batch)}{partial}")
+    return True
+
+
+def run_local_batch(request_path: str | Path, result_path: str | Path, *, client=None) -> int:
+    """Execute a request file synchronously and write a Batch API-shaped result file.
+
+    Useful as a stand-in for the Batch API in development, or against a local gateway.
+    Requests use the "batch" rate-limit lane, so live customer traffic goes first.
+    """
+    client = client or get_openai_client()
+    count = 0
+    with open(result_path, "w", encoding="utf-8") as out:
+        for request in read_jsonl(request_path):
+            line: dict = {"id": f"local-{count}", "custom_id": request["custom_id"]}
+            try:
+                completion = limited_completion(client, request["body"], priority="batch")
+                line["response"] = {"status_code": 200, "body": completion.model_dump()}
+                line["error"] = None
+            except Exception as exc:
+                line["response"] = None
+                line["error"] = {"code": type(exc).__name__, "message": str(exc)}
+            out.write(json.dumps(line) + "\n")
+            count += 1
+    return count
+
+
+def parse_batch_results(result_path: str | Path) -> Dict[str, ClassificationResult]:
+    """Map each result line's custom_id (trace_id) to a `ClassificationResult`.
+
+    Failed or malformed entries fall back to QUERY, matching `triage`.
+    """
+    results: Dict[str, ClassificationResult] = {}
+    for line in read_jsonl(result_path):
+        trace_id = line.get("custom_id")
+        results[trace_id] = triage_result_from_content(_completion_content(line), trace_id=trace_id)
+    return results
+
+
+def _batch_error_summary(batch) -> str:
+    """First batch-level error message (e.g., input file validation), if any."""
+    errors = getattr(getattr(batch, "errors", None), "data", None) or []
+    message = getattr(errors[0], "message", None) if errors else None
+    return f": {message}" if message else ""
+
+
+def _completion_content(line: dict) -> Optional[str]:
+    response = line.get("response") or {}
+    if line.get("error") or response.get("status_code") != 200:
+        return None
+    try:
+        return response["body"]["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline batch triage via the OpenAI Batch API format.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    prep = sub.add_parser("prepare", help="Write a Batch API request file from a JSONL input.")
+    prep.add_argument("input")
+    prep.add_argument("output")
+    prep.add_argument("--model", default=DEFAULT_MODEL)
+    prep.add_argument("--text-field", default="message")
+    prep.add_argument("--id-field", default="trace_id")
+    local = sub.add_parser("run-local", help="Execute a request file directly (Batch API stand-in).")
+    local.add_argument("requests")
+    local.add_argument("results")
+    parse = sub.add_parser("parse", help="Print labels from a Batch API result file.")
+    parse.add_argument("results")
+    args = parser.parse_args()
+
+    if args.command == "prepare":
+        n = write_batch_requests(
+            args.input, args.output, model=args.model, text_field=args.text_field, id_field=args.id_field
+        )
+        print(f"Wrote {n} requests to {args.output}")
+    elif args.command == "run-local":
+        n = run_local_batch(args.requests, args.results)
+        print(f"Wrote {n} results to {args.results}")
+    else:
+        for trace_id, result in parse_batch_results(args.results).items():
+            print(f"{trace_id}\t{result.label.value}\t{result.customer_name or ''}\t{result.ticket_number or ''}")
@@ -6,15 +6,28 @@ Step 1: Define inputs/outputs and a callable interface. Logic will be added next
 from __future__ import annotations
 
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
-from typing import Literal, Optional
+from typing import TYPE_CHECKING, List, Literal, Optional, Sequence
 
-from src.main.openai_client_factory import get_openai_client
+from src.main.openai_client_factory import get_async_openai_client, get_openai_client
+from src.main.rate_limiter import Priority, alimited_completion, limited_completion
+from src.main.response_cache import ResponseCache, prompt_fingerprint
+
+if TYPE_CHECKING:  # avoid loading torch/faiss unless an embedding component is actually used
+    from src.main.local_classifier import LocalClassifier
+    from src.main.semantic_cache import SemanticCache
 
 
 DEFAULT_MODEL = "gpt-4o-mini"
 
+ClassifierBackend = Literal["llm", "local", "cascade"]
+
+# Rule matches (see classifier_rules) at or above this confidence skip the model entirely.
+DEFAULT_RULE_THRESHOLD = 0.9
+
 class ClassificationLabel(str, Enum):
     """Allowed labels for incoming customer messages."""
 
@@ -29,6 +42,9 @@ class ClassificationResult:
 
     label: ClassificationLabel
     rationale: Optional[str] = None  # brief reason/explanation (optional for now)
+    customer_name: Optional[str] = None  # populated by `triage`
+    ticket_number: Optional[str] = None  # populated by `triage`
+    confidence: Optional[float] = None  # set by non-LLM backends (rules, local classifier)
 
     @property
     def route(self) -> Literal["feedback_positive_handler", "feedback_negative_handler", "query_handler"]:
@@ -40,45 +56,282 @@ class ClassificationResult:
         return "query_handler"
 
 
+CLASSIFY_SYSTEM_PROMPT = (
+    "You are a banking customer support triage agent. "
+    "Classify the user's message into exactly one of: "
+    "positive_feedback, negative_feedback, query. "
+    "Return JSON with fields: label, rationale."
+)
+
+TRIAGE_SYSTEM_PROMPT = (
+    "You are a banking customer support triage agent. "
+    "Classify the user's message into exactly one of: "
+    "positive_feedback, negative_feedback, query. "
+    "Also extract the customer's name and any 6-digit ticket number if present. "
+    'Return JSON with fields: label, rationale, name, ticket_number '
+    "(use null for name or ticket_number when absent)."
+)
+
+# Cache entries are keyed on the prompt text, so editing the prompt invalidates them.
+CLASSIFY_PROMPT_VERSION = prompt_fingerprint(CLASSIFY_SYSTEM_PROMPT)
+
+_TICKET_NUMBER_RE = re.compile(r"^\d{6}$")
+
+
 def classify(
     message: str,
     *,
     model: str = DEFAULT_MODEL,
     client=None,
     trace_id: Optional[str] = None,
+    cache: Optional[ResponseCache] = None,
+    semantic_cache: Optional["SemanticCache"] = None,
+    backend: ClassifierBackend = "llm",
+    local_classifier: Optional["LocalClassifier"] = None,
+    rule_threshold: Optional[float] = DEFAULT_RULE_THRESHOLD,
+    priority: Priority = "interactive",
 ) -> ClassificationResult:
-    """Classify a user message with an OpenAI chat model, with graceful fallback."""
-    text = (message or "").strip()
-    if not text:
-        raise ValueError("Message must be a non-empty string.")
+    """Classify a user message with an OpenAI chat model, with graceful fallback.
+
+    Deterministic rules (`classifier_rules`) are consulted first; a match at or above
+    `rule_threshold` returns without any model call. Pass `rule_threshold=None` to skip them.
+
+    Pass a `ResponseCache` to serve repeated messages without a model call, and/or a
+    `SemanticCache` to reuse labels of sufficiently similar messages. Fallback results
+    are never cached.
+
+    `backend="local"` answers from `local_classifier` only; `backend="cascade"` uses it
+    first and escalates to the LLM when its confidence is below the classifier's threshold.
+
+    Model calls go through the shared rate limiter in the `priority` lane.
+    """
+    text = _clean_message(message)
+    ruled = _rule_result(rule_threshold, text, trace_id)
+    if ruled is not None:
+        return ruled
+    local = _local_result(backend, local_classifier, text, trace_id)
+    if local is not None:
+        return local
+    cached = _cache_lookup(cache, semantic_cache, text, model, trace_id)
+    if cached is not None:
+        return cached
+    client = client or get_openai_client()
+    try:
+        parsed = _complete_json(client, model, CLASSIFY_SYSTEM_PROMPT, text, priority)
+    except Exception:
+        return _fallback_result(trace_id)
+    return _cache_store(cache, semantic_cache, text, model, _result_from_payload(parsed, None), trace_id)
+
+
+def triage(
+    message: str,
+    *,
+    model: str = DEFAULT_MODEL,
+    client=None,
+    trace_id: Optional[str] = None,
+    priority: Priority = "interactive",
+) -> ClassificationResult:
+    """Classify and extract name/ticket number in a single JSON completion.
+
+    Falls back to a QUERY result with no name or ticket number if the model call fails.
+    """
+    text = _clean_message(message)
+    client = client or get_openai_client()
+    try:
+        parsed = _complete_json(client, model, TRIAGE_SYSTEM_PROMPT, text, priority)
+    except Exception:
+        return _fallback_result(trace_id)
+    return _triage_result_from_payload(parsed, trace_id)
+
+
+def classify_many(
+    messages: Sequence[str],
+    *,
+    concurrency: int = 8,
+    model: str = DEFAULT_MODEL,
+    client=None,
+    trace_ids: Optional[Sequence[Optional[str]]] = None,
+    cache: Optional[ResponseCache] = None,
+    semantic_cache: Optional["SemanticCache"] = None,
+    backend: ClassifierBackend = "llm",
+    local_classifier: Optional["LocalClassifier"] = None,
+    rule_threshold: Optional[float] = DEFAULT_RULE_THRESHOLD,
+    priority: Priority = "batch",
+) -> List[ClassificationResult]:
+    """Classify many messages with bounded fan-out, returning results in input order.
+
+    Each item falls back to QUERY independently (including empty messages), and
+    `trace_ids[i]`, when given, is attached to the result for `messages[i]`. Model calls
+    default to the "batch" rate-limit lane so interactive traffic goes first.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1.")
+    _check_backend(backend, local_classifier)
+    if trace_ids is not None and len(trace_ids) != len(messages):
+        raise ValueError("trace_ids must be the same length as messages.")
+    if not messages:
+        return []
 
     client = client or get_openai_client()
+    ids = list(trace_ids) if trace_ids is not None else [None] * len(messages)
+
+    def _one(item: tuple[str, Optional[str]]) -> ClassificationResult:
+        message, trace_id = item
+        try:
+            return classify(
+                message,
+                model=model,
+                client=client,
+                trace_id=trace_id,
+                cache=cache,
+                semantic_cache=semantic_cache,
+                backend=backend,
+                local_classifier=local_classifier,
+                rule_threshold=rule_threshold,
+                priority=priority,
+            )
+        except Exception:
+            return _fallback_result(trace_id)
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(messages))) as pool:
+        return list(pool.map(_one, zip(messages, ids)))
+
+
+async def aclassify(
+    message: str,
+    *,
+    model: str = DEFAULT_MODEL,
+    client=None,
+    trace_id: Optional[str] = None,
+    cache: Optional[ResponseCache] = None,
+    semantic_cache: Optional["SemanticCache"] = None,
+    backend: ClassifierBackend = "llm",
+    local_classifier: Optional["LocalClassifier"] = None,
+    rule_threshold: Optional[float] = DEFAULT_RULE_THRESHOLD,
+    priority: Priority = "interactive",
+) -> ClassificationResult:
+    """Async variant of `classify` backed by the shared AsyncOpenAI client."""
+    text = _clean_message(message)
+    ruled = _rule_result(rule_threshold, text, trace_id)
+    if ruled is not None:
+        return ruled
+    local = _local_result(backend, local_classifier, text, trace_id)
+    if local is not None:
+        return local
+    cached = _cache_lookup(cache, semantic_cache, text, model, trace_id)
+    if cached is not None:
+        return cached
+    client = client or get_async_openai_client()
     try:
-        completion = client.chat.completions.create(
-            model=model,
-            temperature=0,
-            response_format={"type": "json_object"},
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a banking customer support triage agent. "
-                        "Classify the user's message into exactly one of: "
-                        "positive_feedback, negative_feedback, query. "
-                        "Return JSON with fields: label, rationale."
-                    ),
-                },
-                {"role": "user", "content": text},
-            ],
-        )
-        raw = completion.choices[0].message.content or "{}"
-        parsed = json.loads(raw)
+        parsed = await _acomplete_json(client, model, CLASSIFY_SYSTEM_PROMPT, text, priority)
     except Exception:
-        rationale = "Classifier unavailable; routing to query handler."
-        if trace_id:
-            rationale += f" trace_id={trace_id}"
-        return ClassificationResult(label=ClassificationLabel.QUERY, rationale=rationale)
+        return _fallback_result(trace_id)
+    return _cache_store(cache, semantic_cache, text, model, _result_from_payload(parsed, None), trace_id)
+
 
+async def atriage(
+    message: str,
+    *,
+    model: str = DEFAULT_MODEL,
+    client=None,
+    trace_id: Optional[str] = None,
+    priority: Priority = "interactive",
+) -> ClassificationResult:
+    """Async variant of `triage` backed by the shared AsyncOpenAI client."""
+    text = _clean_message(message)
+    client = client or get_async_openai_client()
+    try:
+        parsed = await _acomplete_json(client, model, TRIAGE_SYSTEM_PROMPT, text, priority)
+    except Exception:
+        return _fallback_result(trace_id)
+    return _triage_result_from_payload(parsed, trace_id)
+
+
+def classify_by_rules(
+    message: str,
+    *,
+    trace_id: Optional[str] = None,
+    rule_threshold: float = DEFAULT_RULE_THRESHOLD,
+) -> Optional[ClassificationResult]:
+    """Result of a confident deterministic rule match, or None when the model is needed.
+
+    Each call counts toward `classifier_rules.rule_stats`; callers that act on a None here
+    should pass `rule_threshold=None` to `classify` so the rules are not counted twice.
+    """
+    return _rule_result(rule_threshold, _clean_message(message), trace_id)
+
+
+def triage_request_body(message: str, *, model: str = DEFAULT_MODEL) -> dict:
+    """Chat-completions request body that `triage` sends (e.g., for Batch API files)."""
+    return _json_request(model, TRIAGE_SYSTEM_PROMPT, _clean_message(message))
+
+
+def triage_result_from_content(content: Optional[str], *, trace_id: Optional[str] = None) -> ClassificationResult:
+    """Build a triage result from raw completion content; missing content or bad JSON falls back to QUERY."""
+    if content is None:
+        return _fallback_result(trace_id)
+    try:
+        parsed = json.loads(content or "{}")
+        if not isinstance(parsed, dict):
+            raise ValueError("Model did not return a JSON object.")
+    except ValueError:
+        return _fallback_result(trace_id)
+    return _triage_result_from_payload(parsed, trace_id)
+
+
+def normalize_name(name: object) -> Optional[str]:
+    """Normalize a model-extracted name; treat blanks and "none" as missing."""
+    if name is None:
+        return None
+    name_str = str(name).strip()
+    return name_str if name_str and name_str.lower() not in {"none", "null"} else None
+
+
+def _clean_message(message: str) -> str:
+    text = (message or "").strip()
+    if not text:
+        raise ValueError("Message must be a non-empty string.")
+    return text
+
+
+def _json_request(model: str, system_prompt: str, text: str) -> dict:
+    return {
+        "model": model,
+        "temperature": 0,
+        "response_format": {"type": "json_object"},
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": text},
+        ],
+    }
+
+
+def _complete_json(client, model: str, system_prompt: str, text: str, priority: Priority) -> dict:
+    completion = limited_completion(client, _json_request(model, system_prompt, text), priority=priority)
+    return _parse_json_completion(completion)
+
+
+async def _acomplete_json(client, model: str, system_prompt: str, text: str, priority: Priority) -> dict:
+    completion = await alimited_completion(client, _json_request(model, system_prompt, text), priority=priority)
+    return _parse_json_completion(completion)
+
+
+def _parse_json_completion(completion) -> dict:
+    raw = completion.choices[0].message.content or "{}"
+    parsed = json.loads(raw)
+    if not isinstance(parsed, dict):
+        raise ValueError("Model did not return a JSON object.")
+    return parsed
+
+
+def _fallback_result(trace_id: Optional[str]) -> ClassificationResult:
+    rationale = "Classifier unavailable; routing to query handler."
+    if trace_id:
+        rationale += f" trace_id={trace_id}"
+    return ClassificationResult(label=ClassificationLabel.QUERY, rationale=rationale)
+
+
+def _result_from_payload(parsed: dict, trace_id: Optional[str]) -> ClassificationResult:
     label_value = str(parsed.get("label", "")).strip().lower().replace(" ", "_")
 
     # Normalize model output to our enum values.
@@ -94,6 +347,112 @@ def classify(
         rationale += f" trace_id={trace_id}"
     return ClassificationResult(label=label, rationale=rationale)
 
+
+def _with_trace(result: ClassificationResult, trace_id: Optional[str]) -> ClassificationResult:
+    if trace_id:
+        result.rationale = f"{result.rationale or ''} trace_id={trace_id}".lstrip()
+    return result
+
+
+def _rule_result(
+    rule_threshold: Optional[float], text: str, trace_id: Optional[str]
+) -> Optional[ClassificationResult]:
+    """Short-circuit on a confident deterministic rule match; None means keep going."""
+    if rule_threshold is None:
+        return None
+    from src.main.classifier_rules import match_rules  # imports this module for ClassificationLabel
+
+    match = match_rules(text)
+    if match is None or match.confidence < rule_threshold:
+        return None
+    result = ClassificationResult(
+        label=match.label,
+        rationale=f"Matched rule '{match.rule}'.",
+        confidence=match.confidence,
+    )
+    return _with_trace(result, trace_id)
+
+
+def _check_backend(backend: str, local_classifier: Optional["LocalClassifier"]) -> None:
+    if backend not in ("llm", "local", "cascade"):
+        raise ValueError(f"Unknown classifier backend: {backend!r}")
+    if backend != "llm" and local_classifier is None:
+        raise ValueError(f"backend={backend!r} requires a local_classifier.")
+
+
+def _local_result(
+    backend: str,
+    local_classifier: Optional["LocalClassifier"],
+    text: str,
+    trace_id: Optional[str],
+) -> Optional[ClassificationResult]:
+    """Answer locally when the backend allows it; None means continue to the LLM path."""
+    _check_backend(backend, local_classifier)
+    if backend == "llm":
+        return None
+    label, confidence = local_classifier.predict(text)
+    if backend == "cascade" and confidence < local_classifier.confidence_threshold:
+        return None
+    result = ClassificationResult(
+        label=label,
+        rationale=f"Local classifier (confidence={confidence:.2f}).",
+        confidence=confidence,
+    )
+    return _with_trace(result, trace_id)
+
+
+def _cache_lookup(
+    cache: Optional[ResponseCache],
+    semantic_cache: Optional["SemanticCache"],
+    text: str,
+    model: str,
+    trace_id: Optional[str],
+) -> Optional[ClassificationResult]:
+    """Check the exact cache, then the semantic cache; None means call the model."""
+    payload = cache.get(text, model=model, prompt_version=CLASSIFY_PROMPT_VERSION) if cache is not None else None
+    if payload is None and semantic_cache is not None:
+        match = semantic_cache.lookup(text, namespace=_cache_namespace(model))
+        if match is not None:
+            payload = match.payload
+            payload["rationale"] = (
+                f"{payload.get('rationale') or ''} (semantic cache, similarity={match.similarity:.3f})".lstrip()
+            )
+    if payload is None:
+        return None
+    result = ClassificationResult(label=ClassificationLabel(payload["label"]), rationale=payload.get("rationale"))
+    return _with_trace(result, trace_id)
+
+
+def _cache_store(
+    cache: Optional[ResponseCache],
+    semantic_cache: Optional["SemanticCache"],
+    text: str,
+    model: str,
+    result: ClassificationResult,
+    trace_id: Optional[str],
+) -> ClassificationResult:
+    """Cache a trace-free model result, then attach the caller's trace_id."""
+    payload = {"label": result.label.value, "rationale": result.rationale}
+    if cache is not None:
+        cache.put(text, payload, model=model, prompt_version=CLASSIFY_PROMPT_VERSION)
+    if semantic_cache is not None:
+        semantic_cache.add(text, payload, namespace=_cache_namespace(model))
+    return _with_trace(result, trace_id)
+
+
+def _cache_namespace(model: str) -> str:
+    return f"{model}:{CLASSIFY_PROMPT_VERSION}"
+
+
+def _triage_result_from_payload(parsed: dict, trace_id: Optional[str]) -> ClassificationResult:
+    result = _result_from_payload(parsed, trace_id)
+    result.customer_name = normalize_name(parsed.get("name"))
+    ticket = parsed.get("ticket_number")
+    ticket_str = str(ticket).strip().lstrip("#") if ticket is not None else ""
+    result.ticket_number = ticket_str if _TICKET_NUMBER_RE.match(ticket_str) else None
+    return result
+
+
 if __name__ == "__main__":
     # Simple test
     test_message = "My name is John. I love how easy it is to use your mobile app!"
@@ -0,0 +1,135 @@
+"""Deterministic keyword/regex pre-classifier for unambiguous messages.
+
+Rules are compiled once at import. `match_rules` returns the strongest match when all
+matching rules agree on a label; messages that trip rules for different labels are
+treated as ambiguous and left to the model. Per-rule fire counts are kept in-process
+for tuning (`rule_stats`).
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from src.main.classifier import ClassificationLabel
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A named regex that votes for one label with a fixed confidence."""
+
+    name: str
+    label: ClassificationLabel
+    confidence: float
+    pattern: re.Pattern
+
+
+@dataclass(frozen=True)
+class RuleMatch:
+    """The winning rule for a message."""
+
+    label: ClassificationLabel
+    confidence: float
+    rule: str
+
+
+def _rule(name: str, label: ClassificationLabel, confidence: float, pattern: str) -> Rule:
+    return Rule(name, label, confidence, re.compile(pattern, re.IGNORECASE | re.DOTALL))
+
+
+_TICKET = r"\b\d{6}\b"
+# Complaint vocabulary; a message containing any of it is never treated as a plain status query.
+_COMPLAINT = r"\b(terrible|awful|horrible|worst|unacceptable|frustrat\w*|disappointed|furious|complain\w*|ridiculous)\b"
+# A question or an explicit ask, as opposed to a statement that happens to mention a status.
+_STATUS_REQUEST = (
+    r"(\s*(what|where|how|when|can|could|would|will|is|has|any)\b"
+    r"|.*\b(check|tell me|let me know|update on)\b"
+    r"|.*\?\s*$)"
+)
+
+RULES: tuple[Rule, ...] = (
+    _rule(
+        "ticket_status",
+        ClassificationLabel.QUERY,
+        0.97,
+        rf"^(?!.*{_COMPLAINT})(?=.*{_TICKET})(?=.*\b(status|progress)\b)(?={_STATUS_REQUEST})",
+    ),
+    # Weaker verbs also show up in complaints ("ticket 381581 is still open after 3 weeks"),
+    # so this only hints at QUERY and stays below the default threshold.
+    _rule(
+        "ticket_mention",
+        ClassificationLabel.QUERY,
+        0.6,
+        rf"(?=.*{_TICKET})(?=.*\b(update|check|resolved|open)\b)",
+    ),
+    _rule(
+        "status_question",
+        ClassificationLabel.QUERY,
+        0.85,
+        r"\b(what'?s|what is|check|any update on)\b.*\bstatus\b",
+    ),
+    _rule(
+        "thanks_only",
+        ClassificationLabel.POSITIVE_FEEDBACK,
+        0.97,
+        r"^\s*(many\s+)?(thanks|thank\s+you|thx|ty)(\s+(so\s+much|a\s+lot|very\s+much))?\s*[!.]*\s*$",
+    ),
+    _rule(
+        "praise",
+        ClassificationLabel.POSITIVE_FEEDBACK,
+        0.85,
+        r"\b(love|great|excellent|amazing|awesome|fantastic|helpful)\b",
+    ),
+    _rule(
+        "not_arrived",
+        ClassificationLabel.NEGATIVE_FEEDBACK,
+        0.9,
+        r"\b(hasn'?t|has\s+not|haven'?t|have\s+not|never|still\s+not)\s+(arrived|been\s+(delivered|received))\b",
+    ),
+    # Sentiment words alone can be negated or hypothetical ("not disappointed at all",
+    # "I was worried it would be terrible, but..."), so this stays below the default threshold.
+    _rule(
+        "complaint",
+        ClassificationLabel.NEGATIVE_FEEDBACK,
+        0.8,
+        r"(?<!\bnot\s)(?<!n't\s)(?<!\bnever\s)\b(terrible|awful|horrible|worst|unacceptable|frustrat\w*|disappointed|furious)\b",
+    ),
+)
+
+_fire_counts: Counter[str] = Counter()
+_stats_lock = threading.Lock()
+
+
+def match_rules(text: str) -> Optional[RuleMatch]:
+    """Return the highest-confidence match, or None if nothing (or conflicting labels) matched."""
+    best: Optional[Rule] = None
+    labels = set()
+    fired = []
+    for rule in RULES:
+        if rule.pattern.search(text):
+            fired.append(rule.name)
+            labels.add(rule.label)
+            if best is None or rule.confidence > best.confidence:
+                best = rule
+    if fired:
+        with _stats_lock:
+            _fire_counts.update(fired)
+            if len(labels) > 1:
+                _fire_counts["<ambiguous>"] += 1
+    if best is None or len(labels) > 1:
+        return None
+    return RuleMatch(label=best.label, confidence=best.confidence, rule=best.name)
+
+
+def rule_stats() -> Dict[str, int]:
+    """Snapshot of how often each rule has fired (plus `<ambiguous>` conflicts)."""
+    with _stats_lock:
+        return dict(_fire_counts)
+
+
+def reset_rule_stats() -> None:
+    with _stats_lock:
+        _fire_counts.clear()
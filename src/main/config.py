@@ -2,23 +2,85 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import Dict, List, Literal, Optional, Tuple
 
-from pydantic import  Field
+from pydantic import  BaseModel, Field
 from pydantic_settings import BaseSettings
 
+# sentence_transformers model shared by the semantic cache and the local classifier.
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
+class OpenAIEndpoint(BaseModel):
+    """One entry of OPENAI_ENDPOINTS; missing fields fall back to the top-level settings."""
+
+    name: Optional[str] = None
+    base_url: Optional[str] = None
+    api_key: Optional[str] = None
+
 
 class AppConfig(BaseSettings):
     openai_api_key: str = Field(..., env="OPENAI_API_KEY")
     openai_base_url: Optional[str] = Field(None, env="OPENAI_BASE_URL")
+    # HTTP transport for the shared OpenAI clients (see openai_client_factory).
+    openai_max_connections: int = Field(200, env="OPENAI_MAX_CONNECTIONS")
+    openai_max_keepalive_connections: int = Field(100, env="OPENAI_MAX_KEEPALIVE_CONNECTIONS")
+    openai_keepalive_expiry: float = Field(30.0, env="OPENAI_KEEPALIVE_EXPIRY")
+    openai_http2: bool = Field(False, env="OPENAI_HTTP2")  # needs the `h2` package (httpx[http2])
+    openai_connect_timeout: float = Field(5.0, env="OPENAI_CONNECT_TIMEOUT")
+    openai_read_timeout: float = Field(60.0, env="OPENAI_READ_TIMEOUT")
+    openai_max_retries: int = Field(2, env="OPENAI_MAX_RETRIES")
+    # Optional client pool: JSON list, e.g. [{"base_url": "...", "api_key": "..."}, ...].
+    openai_endpoints: List[OpenAIEndpoint] = Field(default_factory=list, env="OPENAI_ENDPOINTS")
+    openai_breaker_failures: int = Field(5, env="OPENAI_BREAKER_FAILURES")  # consecutive, to eject an endpoint
+    openai_breaker_cooldown: float = Field(30.0, env="OPENAI_BREAKER_COOLDOWN")  # seconds before a trial request
+
+    class Config:
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        case_sensitive = False
+        extra = "ignore"  # .env also carries TicketStoreConfig settings
+
+
+class TicketStoreConfig(BaseSettings):
+    """Ticket-store selection; separate from AppConfig so it loads without an API key."""
+
+    ticket_store_backend: Literal["sqlite", "memory", "sharded"] = Field("sqlite", env="TICKET_STORE_BACKEND")
+    ticket_store_path: Optional[str] = Field(None, env="TICKET_STORE_PATH")
+    ticket_store_shards: int = Field(4, env="TICKET_STORE_SHARDS")
 
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
         case_sensitive = False
+        extra = "ignore"
+
+
+class RateLimitConfig(BaseSettings):
+    """Client-side OpenAI rate limits (see rate_limiter); 0 disables a limit."""
+
+    openai_rpm: int = Field(500, env="OPENAI_RPM")
+    openai_tpm: int = Field(200_000, env="OPENAI_TPM")
+    # JSON, e.g. {"gpt-4o": [500, 30000]} -> (rpm, tpm) per model.
+    openai_model_rate_limits: Dict[str, Tuple[int, int]] = Field(default_factory=dict, env="OPENAI_MODEL_RATE_LIMITS")
+
+    class Config:
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        case_sensitive = False
+        extra = "ignore"
 
 
 def load_config() -> AppConfig:
     """Load configuration from environment (and .env if present)."""
     return AppConfig()
 
+
+def load_store_config() -> TicketStoreConfig:
+    """Load ticket-store settings from environment (and .env if present)."""
+    return TicketStoreConfig()
+
+
+def load_rate_limit_config() -> RateLimitConfig:
+    """Load client-side rate limits from environment (and .env if present)."""
+    return RateLimitConfig()
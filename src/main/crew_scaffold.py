@@ -5,41 +5,237 @@ This keeps things simple:
 - Step 2: pick the appropriate agent (feedback or query) based on the label.
 - Step 3: run a single-task crew for that agent to produce a response.
 
+`ahandle_message` runs the same flow on asyncio with the shared AsyncOpenAI client and the
+async ticket store. `handle_message_stream` / `ahandle_message_stream` yield the reply as
+it is generated, so the customer sees text after the first token instead of the full reply.
+
 Requirements: `OPENAI_API_KEY` (and optionally `OPENAI_BASE_URL`) set in the environment.
 """
 
+import asyncio
 import json
 import re
-import secrets
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterator, Optional
 
 from crewai import Agent, Crew, Process, Task
 
-from src.main.classifier import ClassificationLabel, classify
-from src.main.openai_client_factory import get_openai_client
+from src.main.classifier import (
+    ClassificationLabel,
+    ClassificationResult,
+    aclassify,
+    atriage,
+    classify,
+    classify_by_rules,
+    normalize_name,
+    triage,
+)
+from src.main.async_support_store import get_async_ticket_store
+from src.main.openai_client_factory import get_async_openai_client, get_openai_client
 from src.main.openai_llm_adapter import OpenAIChatLLM
-from src.main.support_store import create_ticket, get_ticket_status, init_db
+from src.main.rate_limiter import alimited_completion, limited_completion
+from src.main.support_store import TicketNumbersExhausted, allocate_ticket_number, create_ticket, get_ticket_status
+
+# Shared pool for pre-dispatch LLM calls that can overlap (e.g., name extraction).
+_PRE_DISPATCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="pre-dispatch")
+
+
+_NAME_SYSTEM_PROMPT = (
+    "You are a banking customer support triage agent. "
+    "Extract the customer's name from the message if present. "
+    'Return JSON like {"name": "<name>"} or {"name": null}.'
+)
 
 
 def _build_llm(model: str = "gpt-4o-mini") -> OpenAIChatLLM:
     return OpenAIChatLLM(
-        client=get_openai_client(),
+        # The adapter retries transient errors itself; SDK retries on top would multiply them.
+        client=get_openai_client(max_retries=0),
         model=model,
         temperature=0.0,
+        async_client=get_async_openai_client(max_retries=0),
     )
     
 
 
-def handle_message(message: str, *, trace_id: Optional[str] = None, model: str = "gpt-4o-mini") -> str:
-    """Entry point: classify and delegate to the appropriate CrewAI agent."""
-    init_db()
-    classification = classify(message, trace_id=trace_id, model=model)
+def handle_message(
+    message: str,
+    *,
+    trace_id: Optional[str] = None,
+    model: str = "gpt-4o-mini",
+    combined_triage: bool = True,
+) -> str:
+    """Entry point: classify and delegate to the appropriate CrewAI agent.
+
+    With `combined_triage` (the default) the label, rationale, customer name and ticket
+    number come from one structured completion; otherwise `classify` and the name
+    extractor run as separate, concurrent calls. Confident rule-matched queries skip both,
+    and without `combined_triage` a confident feedback match skips `classify`.
+    """
+    classification, customer_name = _classify_for_dispatch(message, trace_id, model, combined_triage)
+    agent, task = _dispatch(message, classification, customer_name, trace_id, model)
+    crew = Crew(agents=[agent], tasks=[task], process=Process.sequential)
+    result = crew.kickoff({"message": message, "trace_id": trace_id, "classification": classification.label.value})
+    return str(result)
+
+
+async def ahandle_message(
+    message: str,
+    *,
+    trace_id: Optional[str] = None,
+    model: str = "gpt-4o-mini",
+    combined_triage: bool = True,
+) -> str:
+    """Asyncio entry point mirroring `handle_message`, built on the shared AsyncOpenAI client."""
+    classification, customer_name = await _aclassify_for_dispatch(message, trace_id, model, combined_triage)
+    agent, task = await _adispatch(message, classification, customer_name, trace_id, model)
+    crew = Crew(agents=[agent], tasks=[task], process=Process.sequential)
+    # `akickoff` runs the task natively on the event loop (via `OpenAIChatLLM.acall`);
+    # `kickoff_async`, the only option in older crewai, just moves `kickoff` to a worker thread.
+    kickoff = getattr(crew, "akickoff", None) or crew.kickoff_async
+    result = await kickoff({"message": message, "trace_id": trace_id, "classification": classification.label.value})
+    return str(result)
+
+
+def handle_message_stream(
+    message: str,
+    *,
+    trace_id: Optional[str] = None,
+    model: str = "gpt-4o-mini",
+    combined_triage: bool = True,
+) -> Iterator[str]:
+    """Streaming `handle_message`: yield reply text deltas as the model produces them.
+
+    Classification and ticket handling are unchanged. The reply comes from one streamed
+    completion built from the chosen agent's persona and task (these agents have no tools),
+    rather than from a Crew run, which only returns once the whole answer exists.
+    """
+    classification, customer_name = _classify_for_dispatch(message, trace_id, model, combined_triage)
+    agent, task = _dispatch(message, classification, customer_name, trace_id, model)
+    yield from _build_llm(model).stream_call(_reply_messages(agent, task))
 
-    customer_name = _extract_customer_name(message, model)
+
+async def ahandle_message_stream(
+    message: str,
+    *,
+    trace_id: Optional[str] = None,
+    model: str = "gpt-4o-mini",
+    combined_triage: bool = True,
+) -> AsyncIterator[str]:
+    """Async generator mirroring `handle_message_stream`."""
+    classification, customer_name = await _aclassify_for_dispatch(message, trace_id, model, combined_triage)
+    agent, task = await _adispatch(message, classification, customer_name, trace_id, model)
+    async for delta in _build_llm(model).astream_call(_reply_messages(agent, task)):
+        yield delta
+
+
+def _classify_for_dispatch(
+    message: str, trace_id: Optional[str], model: str, combined_triage: bool
+) -> tuple[ClassificationResult, Optional[str]]:
+    """Label and customer name for a message (rules, then triage or classify + name).
+
+    Rules are consulted once here; `classify` is told to skip them.
+    """
+    ruled = classify_by_rules(message, trace_id=trace_id)
+    if ruled is not None and ruled.label == ClassificationLabel.QUERY:
+        return ruled, None
+    if combined_triage:
+        classification = triage(message, trace_id=trace_id, model=model)
+        return classification, classification.customer_name
+    if ruled is not None:
+        return ruled, _extract_customer_name(message, model)
+    return _classify_and_extract_name(message, trace_id, model)
+
+
+async def _aclassify_for_dispatch(
+    message: str, trace_id: Optional[str], model: str, combined_triage: bool
+) -> tuple[ClassificationResult, Optional[str]]:
+    """Async `_classify_for_dispatch`."""
+    ruled = classify_by_rules(message, trace_id=trace_id)
+    if ruled is not None and ruled.label == ClassificationLabel.QUERY:
+        return ruled, None
+    if combined_triage:
+        classification = await atriage(message, trace_id=trace_id, model=model)
+        return classification, classification.customer_name
+    if ruled is not None:
+        return ruled, await _aextract_customer_name(message, model)
+    classification, customer_name = await asyncio.gather(
+        aclassify(message, trace_id=trace_id, model=model, rule_threshold=None),
+        _aextract_customer_name(message, model),
+    )
+    return classification, customer_name
+
+
+def _reply_messages(agent: Agent, task: Task) -> list[dict]:
+    """Chat messages equivalent to a single-task, tool-free crew run for `agent`."""
+    return [
+        {"role": "system", "content": f"You are {agent.role}. {agent.backstory}\nYour goal: {agent.goal}"},
+        {
+            "role": "user",
+            "content": (
+                f"{task.description}\n\nExpected output: {task.expected_output}\n"
+                "Reply with the customer-facing message only."
+            ),
+        },
+    ]
+
+
+def _dispatch(
+    message: str,
+    classification: ClassificationResult,
+    customer_name: Optional[str],
+    trace_id: Optional[str],
+    model: str,
+) -> tuple[Agent, Task]:
+    """Pick the agent/task for a label, touching the ticket store as needed."""
+    ticket_number, ticket_info = None, None
     if classification.label == ClassificationLabel.QUERY:
-        agent = _query_agent(model)
-        ticket_number = _extract_ticket_number(message)
+        ticket_number = _extract_ticket_number(message) or classification.ticket_number
         ticket_info = get_ticket_status(ticket_number) if ticket_number else None
+    elif classification.label == ClassificationLabel.NEGATIVE_FEEDBACK:
+        try:
+            ticket_number = _generate_ticket_number()
+        except TicketNumbersExhausted:
+            pass  # still apologize; the reply says the team will follow up, without a number
+        else:
+            create_ticket(ticket_number, message, status="Unresolved", customer_name=customer_name)
+    return _agent_and_task(message, classification, customer_name, trace_id, model, ticket_number, ticket_info)
+
+
+async def _adispatch(
+    message: str,
+    classification: ClassificationResult,
+    customer_name: Optional[str],
+    trace_id: Optional[str],
+    model: str,
+) -> tuple[Agent, Task]:
+    """Async `_dispatch`: store calls go through the DB thread instead of blocking the loop."""
+    store = get_async_ticket_store()
+    ticket_number, ticket_info = None, None
+    if classification.label == ClassificationLabel.QUERY:
+        ticket_number = _extract_ticket_number(message) or classification.ticket_number
+        ticket_info = await store.get_ticket_status(ticket_number) if ticket_number else None
+    elif classification.label == ClassificationLabel.NEGATIVE_FEEDBACK:
+        try:
+            ticket_number = await store.allocate_ticket_number()
+        except TicketNumbersExhausted:
+            pass
+        else:
+            await store.create_ticket(ticket_number, message, status="Unresolved", customer_name=customer_name)
+    return _agent_and_task(message, classification, customer_name, trace_id, model, ticket_number, ticket_info)
+
+
+def _agent_and_task(
+    message: str,
+    classification: ClassificationResult,
+    customer_name: Optional[str],
+    trace_id: Optional[str],
+    model: str,
+    ticket_number: Optional[str],
+    ticket_info: Optional[tuple[str, Optional[str]]],
+) -> tuple[Agent, Task]:
+    if classification.label == ClassificationLabel.QUERY:
+        agent = _query_agent(model)
         ticket_status, ticket_customer_name = ticket_info if ticket_info else (None, None)
         task = _query_task(agent, message, trace_id, ticket_number, ticket_status, ticket_customer_name)
     elif classification.label == ClassificationLabel.POSITIVE_FEEDBACK:
@@ -47,44 +243,60 @@ def handle_message(message: str, *, trace_id: Optional[str] = None, model: str =
         task = _positive_feedback_task(agent, message, trace_id, customer_name)
     else:
         agent = _negative_feedback_agent(model)
-        ticket_number = _generate_ticket_number()
-        create_ticket(ticket_number, message, status="Unresolved", customer_name=customer_name)
         task = _negative_feedback_task(agent, message, trace_id, ticket_number, customer_name)
+    return agent, task
+
+
+def _classify_and_extract_name(
+    message: str, trace_id: Optional[str], model: str
+) -> tuple[ClassificationResult, Optional[str]]:
+    """Run `classify` and name extraction concurrently; each keeps its own fallback."""
+    name_future = _PRE_DISPATCH_POOL.submit(_extract_customer_name, message, model)
+    try:
+        classification = classify(message, trace_id=trace_id, model=model, rule_threshold=None)
+    except BaseException:
+        name_future.cancel()
+        raise
+    return classification, name_future.result()
 
-    crew = Crew(agents=[agent], tasks=[task], process=Process.sequential)
-    result = crew.kickoff({"message": message, "trace_id": trace_id, "classification": classification.label.value})
-    return str(result)
 
 def _extract_customer_name(message: str, model: str) -> Optional[str]:
     """Extract a customer name using a JSON schema for stability."""
     client = get_openai_client()
     try:
-        completion = client.chat.completions.create(
-            model=model,
-            temperature=0,
-            response_format={"type": "json_object"},
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a banking customer support triage agent. "
-                        "Extract the customer's name from the message if present. "
-                        'Return JSON like {"name": "<name>"} or {"name": null}.'
-                    ),
-                },
-                {"role": "user", "content": message},
-            ],
-        )
-        raw = completion.choices[0].message.content or "{}"
-        data = json.loads(raw)
-        name = data.get("name")
-        if name is None:
-            return None
-        name_str = str(name).strip()
-        return name_str if name_str and name_str.lower() != "none" else None
+        completion = limited_completion(client, _name_request(message, model))
+        return _parse_name_completion(completion)
     except Exception:
         return None
 
+
+async def _aextract_customer_name(message: str, model: str) -> Optional[str]:
+    """Async variant of `_extract_customer_name`."""
+    client = get_async_openai_client()
+    try:
+        completion = await alimited_completion(client, _name_request(message, model))
+        return _parse_name_completion(completion)
+    except Exception:
+        return None
+
+
+def _name_request(message: str, model: str) -> dict:
+    return {
+        "model": model,
+        "temperature": 0,
+        "response_format": {"type": "json_object"},
+        "messages": [
+            {"role": "system", "content": _NAME_SYSTEM_PROMPT},
+            {"role": "user", "content": message},
+        ],
+    }
+
+
+def _parse_name_completion(completion) -> Optional[str]:
+    raw = completion.choices[0].message.content or "{}"
+    data = json.loads(raw)
+    return normalize_name(data.get("name"))
+
 def _positive_feedback_agent(model: str) -> Agent:
     return Agent(
         role="Feedback Handler",
@@ -98,7 +310,7 @@ def _positive_feedback_agent(model: str) -> Agent:
 def _positive_feedback_task(agent: Agent, message: str, trace_id: Optional[str], customer_name: Optional[str]) -> Task:
     return Task(
         description=(
-            f"CustomerName:{customer_name}\n" if customer_name else ""
+            (f"CustomerName:{customer_name}\n" if customer_name else "") +
             f"Customer message: {message}\n"
             "Respond with format: `Thank you for your kind words, [CustomerName]! We're delighted to assist you.` "
             "If no name is provided, omit the name gracefully.\n"
@@ -125,19 +337,28 @@ def _negative_feedback_task(
     agent: Agent,
     message: str,
     trace_id: Optional[str],
-    ticket_number: str,
+    ticket_number: Optional[str],
     customer_name: Optional[str],
 ) -> Task:
-    return Task(
-        description=(
-            f"CustomerName:{customer_name}\n" if customer_name else ""
-            f"Customer message: {message}\n"
+    if ticket_number is None:  # no ticket numbers left (see TicketNumbersExhausted)
+        ticket_text = (
+            "No ticket could be created.\n"
+            "Respond with empathy, apologize, and say our team will follow up shortly. Do not quote a ticket number.\n"
+        )
+    else:
+        ticket_text = (
             f"Ticket number: {ticket_number}\n"
             "Respond with empathy, apologize, and include the ticket number.\n"
             "Format guidance: `We apologize for the inconvenience. A new ticket #[TicketNumber] has been generated, and our team will follow up shortly.`\n"
+        )
+    return Task(
+        description=(
+            (f"CustomerName:{customer_name}\n" if customer_name else "") +
+            f"Customer message: {message}\n"
+            f"{ticket_text}"
             "Keep it to 1-2 sentences. Include the trace_id if provided."
         ),
-        expected_output="A concise, empathetic response that includes the ticket number.",
+        expected_output="A concise, empathetic response (with the ticket number, when one was created).",
         agent=agent,
         tools=[],
         metadata={"trace_id": trace_id},
@@ -173,7 +394,7 @@ def _query_task(
     )
     return Task(
         description=(
-            f"CustomerName:{customer_name}\n" if customer_name else ""
+            (f"CustomerName:{customer_name}\n" if customer_name else "") +
             f"Customer message: {message}\n"
             f"{status_text}\n"
             "If ticket status is known, return it. If not found, state that. "
@@ -188,8 +409,8 @@ def _query_task(
 
 
 def _generate_ticket_number() -> str:
-    """Create a 6-digit ticket number."""
-    return f"{secrets.randbelow(900000) + 100000}"
+    """Create a unique 6-digit ticket number."""
+    return allocate_ticket_number()
 
 
 def _extract_ticket_number(text: str) -> Optional[str]:
@@ -0,0 +1,16 @@
+"""JSON Lines helpers shared by the batch and local-classifier pipelines."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Iterator
+
+
+def read_jsonl(path: str | Path) -> Iterator[dict]:
+    """Yield one JSON object per non-blank line without loading the whole file."""
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
@@ -0,0 +1,105 @@
+"""Local, zero-network classifier built on sentence_transformers embeddings.
+
+A nearest-centroid model: each `ClassificationLabel` is represented by the mean of the
+normalized embeddings of messages the LLM previously gave that label. Prediction is one
+embedding plus three dot products, so it runs on CPU in a few milliseconds.
+
+`classify(..., backend="local"|"cascade", local_classifier=...)` uses it; in cascade mode
+only low-confidence predictions escalate to the LLM.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from src.main.classifier import ClassificationLabel
+from src.main.config import DEFAULT_EMBEDDING_MODEL
+from src.main.jsonl import read_jsonl
+
+_LABELS = list(ClassificationLabel)
+
+
+class LocalClassifier:
+    """Nearest-centroid classifier over normalized sentence embeddings."""
+
+    def __init__(
+        self,
+        *,
+        confidence_threshold: float = 0.8,
+        temperature: float = 0.05,
+        encoder: Optional[SentenceTransformer] = None,
+        embedding_model: str = DEFAULT_EMBEDDING_MODEL,
+    ):
+        self.confidence_threshold = confidence_threshold
+        self.temperature = temperature
+        self._encoder = encoder or SentenceTransformer(embedding_model)
+        self._centroids: Optional[np.ndarray] = None  # (len(_LABELS), dim), rows normalized
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def fit(self, messages: Sequence[str], labels: Sequence[ClassificationLabel | str]) -> "LocalClassifier":
+        """Fit centroids from (message, label) pairs; every label needs at least one example."""
+        if len(messages) != len(labels):
+            raise ValueError("messages and labels must be the same length.")
+        label_idx = np.array([_LABELS.index(ClassificationLabel(label)) for label in labels])
+        missing = [label.value for i, label in enumerate(_LABELS) if not np.any(label_idx == i)]
+        if missing:
+            raise ValueError(f"No training examples for label(s): {', '.join(missing)}")
+
+        vectors = self._embed(messages)
+        centroids = np.stack([vectors[label_idx == i].mean(axis=0) for i in range(len(_LABELS))])
+        self._centroids = _normalize(centroids)
+        return self
+
+    def fit_jsonl(
+        self, path: str | Path, *, text_field: str = "message", label_field: str = "label"
+    ) -> "LocalClassifier":
+        """Fit from a JSONL log of prior LLM classifications (one object per line)."""
+        messages: list[str] = []
+        labels: list[str] = []
+        for record in read_jsonl(path):
+            text = str(record.get(text_field) or "").strip()
+            if text and record.get(label_field):
+                messages.append(text)
+                labels.append(record[label_field])
+        return self.fit(messages, labels)
+
+    def predict(self, message: str) -> tuple[ClassificationLabel, float]:
+        """Return the most likely label and its softmax confidence in [0, 1]."""
+        if self._centroids is None:
+            raise RuntimeError("LocalClassifier has not been trained; call fit() or load().")
+        sims = self._embed([message])[0] @ self._centroids.T
+        logits = sims / self.temperature
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        best = int(np.argmax(probs))
+        return _LABELS[best], float(probs[best])
+
+    def save(self, path: str | Path) -> None:
+        if self._centroids is None:
+            raise RuntimeError("Nothing to save; LocalClassifier has not been trained.")
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as fh:
+            np.savez(fh, centroids=self._centroids, labels=np.array([label.value for label in _LABELS]))
+
+    def load(self, path: str | Path) -> "LocalClassifier":
+        data = np.load(path)
+        if [str(v) for v in data["labels"]] != [label.value for label in _LABELS]:
+            raise ValueError(f"Saved label set in {path} does not match ClassificationLabel.")
+        self._centroids = data["centroids"]
+        return self
+
+    def _embed(self, messages: Iterable[str]) -> np.ndarray:
+        vectors = self._encoder.encode(list(messages), normalize_embeddings=True, convert_to_numpy=True)
+        return np.asarray(vectors, dtype="float32")
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
@@ -1,33 +1,398 @@
-"""Factory for sharing a single OpenAI client instance across agents."""
+"""Factory for sharing OpenAI client instances across agents.
+
+Clients are built on explicitly configured `httpx` clients so connection reuse holds up
+under many concurrent calls: the keep-alive pool size, HTTP/2, connect/read timeouts and
+SDK-level retries all come from `AppConfig` (OPENAI_MAX_CONNECTIONS, OPENAI_HTTP2, ...).
+
+When `AppConfig.openai_endpoints` lists several endpoints/keys, the factories return a
+pooled client instead: each `chat.completions.create` goes to the endpoint with the lowest
+expected wait (EWMA latency x in-flight requests), endpoints that keep failing are ejected
+by a circuit breaker for a cool-down, and `client_pool_stats()` reports per-endpoint
+counters. Other APIs (files, batches, ...) always use the first endpoint, so multi-step
+flows stay on one account.
+
+Clients and pools are cached per distinct (api_key, base_url, config) argument set.
+Passing `max_retries` returns a variant of the shared client with a different SDK retry
+count; it shares the same connections and breaker state.
+"""
 
 from __future__ import annotations
 
-import os
-from functools import lru_cache
-from typing import Optional
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional, Union
+from urllib.parse import urlparse
+
+import httpx
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI, OpenAI
+
+from .config import AppConfig, OpenAIEndpoint, load_config
 
-from openai import OpenAI
+# Weight of the newest sample in the per-endpoint latency average.
+LATENCY_EWMA_ALPHA = 0.2
 
-from .config import AppConfig, load_config
+SyncClient = Union[OpenAI, "PooledOpenAI"]
+AsyncClient = Union[AsyncOpenAI, "PooledAsyncOpenAI"]
 
 
-@lru_cache(maxsize=1)
 def get_openai_client(
     api_key: Optional[str] = None,
     base_url: Optional[str] = None,
     config: Optional[AppConfig] = None,
-) -> OpenAI:
+    *,
+    max_retries: Optional[int] = None,
+) -> SyncClient:
     """
-    Return a shared OpenAI client.
+    Return a shared OpenAI client (a `PooledOpenAI` when several endpoints are configured).
 
     Args:
         api_key: Optional explicit API key; defaults to config/env OPENAI_API_KEY.
         base_url: Optional override for custom endpoints; defaults to config/env OPENAI_BASE_URL.
         config: Optional pre-loaded AppConfig to avoid reloading .env.
+        max_retries: Optional SDK retry count overriding OPENAI_MAX_RETRIES (e.g., 0 for
+            callers that retry themselves).
     """
-    cfg = config or (load_config() if api_key is None and base_url is None else None)
-    key = api_key or (cfg.openai_api_key if cfg else os.getenv("OPENAI_API_KEY"))
-    if not key:
-        raise EnvironmentError("Set OPENAI_API_KEY or pass api_key to get_openai_client.")
-        
-    return OpenAI(api_key=key)
+    entry = _shared(api_key, base_url, config, "get_openai_client")
+    if isinstance(entry, ClientPool):
+        return entry.clients(max_retries)[0]
+    return entry.sync_client(max_retries)
+
+
+def get_async_openai_client(
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    config: Optional[AppConfig] = None,
+    *,
+    max_retries: Optional[int] = None,
+) -> AsyncClient:
+    """
+    Return a shared AsyncOpenAI client for asyncio callers.
+
+    Takes the same arguments as `get_openai_client`; sync and async clients for the same
+    arguments share one pool (and its stats).
+    """
+    entry = _shared(api_key, base_url, config, "get_async_openai_client")
+    if isinstance(entry, ClientPool):
+        return entry.clients(max_retries)[1]
+    return entry.async_client(max_retries)
+
+
+def client_pool_stats() -> dict[str, dict[str, Any]]:
+    """Per-endpoint stats for every pool created by the factories, keyed by endpoint name."""
+    with _shared_lock:
+        pools = [entry for entry in _shared_entries.values() if isinstance(entry, ClientPool)]
+    stats: dict[str, dict[str, Any]] = {}
+    for pool in pools:
+        stats.update(pool.stats())
+    return stats
+
+
+class Endpoint:
+    """One upstream (base URL + key) with lazily built clients, load and breaker state."""
+
+    def __init__(self, name: str, cfg: AppConfig):
+        self.name = name
+        self.cfg = cfg
+        self._sync: Optional[OpenAI] = None
+        self._async: Optional[AsyncOpenAI] = None
+        # max_retries -> with_options() copy of the client above (same HTTP connection pool).
+        self._sync_variants: dict[int, OpenAI] = {}
+        self._async_variants: dict[int, AsyncOpenAI] = {}
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.ewma_latency: Optional[float] = None
+        self.open_until = 0.0  # breaker is open while time.monotonic() < open_until
+        self.probing = False  # a half-open trial request is in flight
+
+    def sync_client(self, max_retries: Optional[int] = None) -> OpenAI:
+        with self._lock:
+            if self._sync is None:
+                self._sync = _build_client(self.cfg)
+            if max_retries is None or max_retries == self.cfg.openai_max_retries:
+                return self._sync
+            if max_retries not in self._sync_variants:
+                self._sync_variants[max_retries] = self._sync.with_options(max_retries=max_retries)
+            return self._sync_variants[max_retries]
+
+    def async_client(self, max_retries: Optional[int] = None) -> AsyncOpenAI:
+        with self._lock:
+            if self._async is None:
+                self._async = _build_async_client(self.cfg)
+            if max_retries is None or max_retries == self.cfg.openai_max_retries:
+                return self._async
+            if max_retries not in self._async_variants:
+                self._async_variants[max_retries] = self._async.with_options(max_retries=max_retries)
+            return self._async_variants[max_retries]
+
+    def state(self, now: float) -> str:
+        if self.open_until == 0.0:
+            return "closed"
+        return "open" if now < self.open_until else "half-open"
+
+
+class ClientPool:
+    """Routes chat completions across endpoints; see the module docstring."""
+
+    def __init__(self, endpoints: list[Endpoint], *, failure_threshold: int = 5, cooldown: float = 30.0):
+        if not endpoints:
+            raise ValueError("ClientPool needs at least one endpoint.")
+        self.endpoints = endpoints
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self.client = PooledOpenAI(self)
+        self.async_client = PooledAsyncOpenAI(self)
+        self._variants: dict[int, tuple[PooledOpenAI, PooledAsyncOpenAI]] = {}
+
+    @classmethod
+    def from_config(cls, cfg: AppConfig) -> "ClientPool":
+        endpoints = []
+        for index, spec in enumerate(cfg.openai_endpoints):
+            endpoint_cfg = cfg.model_copy(
+                update={
+                    "openai_api_key": spec.api_key or cfg.openai_api_key,
+                    "openai_base_url": spec.base_url or cfg.openai_base_url,
+                }
+            )
+            endpoints.append(Endpoint(_endpoint_name(spec, index), endpoint_cfg))
+        return cls(endpoints, failure_threshold=cfg.openai_breaker_failures, cooldown=cfg.openai_breaker_cooldown)
+
+    def clients(self, max_retries: Optional[int] = None) -> tuple["PooledOpenAI", "PooledAsyncOpenAI"]:
+        """Sync and async pooled clients; `max_retries` overrides the endpoints' SDK retry count."""
+        if max_retries is None:
+            return self.client, self.async_client
+        with self._lock:
+            if max_retries not in self._variants:
+                self._variants[max_retries] = (PooledOpenAI(self, max_retries), PooledAsyncOpenAI(self, max_retries))
+            return self._variants[max_retries]
+
+    @contextmanager
+    def acquire(self) -> Iterator[Endpoint]:
+        """Pick an endpoint for one request and record its latency and outcome."""
+        endpoint = self._choose()
+        start = time.perf_counter()
+        try:
+            yield endpoint
+        except (APIConnectionError, APIStatusError) as exc:
+            if isinstance(exc, APIConnectionError) or exc.status_code == 429 or exc.status_code >= 500:
+                self._record(endpoint, None)
+            else:  # the request itself was bad; says nothing about endpoint health
+                self._record(endpoint, time.perf_counter() - start)
+            raise
+        except BaseException:
+            self._release(endpoint)
+            raise
+        else:
+            self._record(endpoint, time.perf_counter() - start)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                endpoint.name: {
+                    "state": endpoint.state(now),
+                    "in_flight": endpoint.in_flight,
+                    "requests": endpoint.requests,
+                    "failures": endpoint.failures,
+                    "times_opened": endpoint.times_opened,
+                    "ewma_latency_ms": None if endpoint.ewma_latency is None else endpoint.ewma_latency * 1000,
+                }
+                for endpoint in self.endpoints
+            }
+
+    def _choose(self) -> Endpoint:
+        now = time.monotonic()
+        with self._lock:
+            available = [
+                endpoint
+                for endpoint in self.endpoints
+                if endpoint.state(now) == "closed" or (endpoint.state(now) == "half-open" and not endpoint.probing)
+            ]
+            if available:
+                known = [endpoint.ewma_latency for endpoint in available if endpoint.ewma_latency is not None]
+                best = min(known) if known else 0.0
+
+                def expected_wait(e: Endpoint) -> float:
+                    if e.ewma_latency is None:  # unmeasured: try it once, then treat it like the best
+                        return best * e.in_flight
+                    return e.ewma_latency * (e.in_flight + 1)
+
+                endpoint = min(available, key=lambda e: (expected_wait(e), e.in_flight))
+            else:  # everything is ejected: try the one that has been out the longest
+                endpoint = min(self.endpoints, key=lambda e: e.open_until)
+            if endpoint.state(now) == "half-open":
+                endpoint.probing = True
+            endpoint.in_flight += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def _record(self, endpoint: Endpoint, latency: Optional[float]) -> None:
+        """Record a finished request; `latency=None` marks an endpoint failure."""
+        with self._lock:
+            endpoint.in_flight -= 1
+            endpoint.probing = False
+            if latency is None:
+                endpoint.failures += 1
+                endpoint.consecutive_failures += 1
+                if endpoint.open_until or endpoint.consecutive_failures >= self.failure_threshold:
+                    endpoint.open_until = time.monotonic() + self.cooldown
+                    endpoint.times_opened += 1
+                return
+            endpoint.consecutive_failures = 0
+            endpoint.open_until = 0.0
+            if endpoint.ewma_latency is None:
+                endpoint.ewma_latency = latency
+            else:
+                endpoint.ewma_latency += LATENCY_EWMA_ALPHA * (latency - endpoint.ewma_latency)
+
+    def _release(self, endpoint: Endpoint) -> None:
+        """Undo `_choose` for a request that ended without an answer (e.g., cancelled)."""
+        with self._lock:
+            endpoint.in_flight -= 1
+            endpoint.probing = False
+
+
+class PooledOpenAI:
+    """Duck-typed `OpenAI` whose chat completions are load-balanced across a `ClientPool`."""
+
+    def __init__(self, pool: ClientPool, max_retries: Optional[int] = None):
+        self.pool = pool
+        self.max_retries = max_retries
+        self.chat = _Namespace(completions=_PooledCompletions(pool, max_retries))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.pool.endpoints[0].sync_client(self.max_retries), name)
+
+
+class PooledAsyncOpenAI:
+    """Async counterpart of `PooledOpenAI`."""
+
+    def __init__(self, pool: ClientPool, max_retries: Optional[int] = None):
+        self.pool = pool
+        self.max_retries = max_retries
+        self.chat = _Namespace(completions=_AsyncPooledCompletions(pool, max_retries))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.pool.endpoints[0].async_client(self.max_retries), name)
+
+
+@dataclass
+class _Namespace:
+    completions: Any
+
+
+class _PooledCompletions:
+    def __init__(self, pool: ClientPool, max_retries: Optional[int] = None):
+        self.pool = pool
+        self.max_retries = max_retries
+
+    def create(self, **kwargs: Any) -> Any:
+        with self.pool.acquire() as endpoint:
+            return endpoint.sync_client(self.max_retries).chat.completions.create(**kwargs)
+
+
+class _AsyncPooledCompletions:
+    def __init__(self, pool: ClientPool, max_retries: Optional[int] = None):
+        self.pool = pool
+        self.max_retries = max_retries
+
+    async def create(self, **kwargs: Any) -> Any:
+        with self.pool.acquire() as endpoint:
+            return await endpoint.async_client(self.max_retries).chat.completions.create(**kwargs)
+
+
+_shared_lock = threading.Lock()
+_shared_entries: dict[tuple, Union[Endpoint, ClientPool]] = {}
+
+
+def _shared(
+    api_key: Optional[str],
+    base_url: Optional[str],
+    config: Optional[AppConfig],
+    caller: str,
+) -> Union[Endpoint, ClientPool]:
+    """Return the cached single endpoint or pool for these arguments, creating it once."""
+    key = (api_key, base_url, config.model_dump_json() if config is not None else None)
+    with _shared_lock:
+        entry = _shared_entries.get(key)
+        if entry is None:
+            cfg = _resolve_config(api_key, base_url, config, caller)
+            if cfg.openai_endpoints and base_url is None:
+                entry = ClientPool.from_config(cfg)
+            else:
+                entry = Endpoint(_endpoint_name(None, 0, cfg.openai_base_url), cfg)
+            _shared_entries[key] = entry
+        return entry
+
+
+def _resolve_config(
+    api_key: Optional[str],
+    base_url: Optional[str],
+    config: Optional[AppConfig],
+    caller: str,
+) -> AppConfig:
+    """Merge explicit arguments over `config` (or over settings loaded from env/.env)."""
+    overrides = {"openai_api_key": api_key, "openai_base_url": base_url}
+    overrides = {name: value for name, value in overrides.items() if value}
+    if config is None:
+        if api_key is None:
+            config = load_config()
+        else:
+            # Explicit key: still read HTTP tuning from env/.env, but don't require OPENAI_API_KEY.
+            config = AppConfig(**overrides)
+    if overrides:
+        config = config.model_copy(update=overrides)
+    if not config.openai_api_key and not any(spec.api_key for spec in config.openai_endpoints):
+        raise EnvironmentError(f"Set OPENAI_API_KEY or pass api_key to {caller}.")
+    return config
+
+
+def _endpoint_name(spec: Optional[OpenAIEndpoint], index: int, base_url: Optional[str] = None) -> str:
+    if spec is not None and spec.name:
+        return spec.name
+    url = (spec.base_url if spec is not None else None) or base_url
+    host = urlparse(url).netloc if url else "api.openai.com"
+    return f"{host}#{index}"
+
+
+def _build_client(cfg: AppConfig) -> OpenAI:
+    return OpenAI(
+        api_key=cfg.openai_api_key,
+        base_url=cfg.openai_base_url,
+        timeout=_timeout(cfg),
+        max_retries=cfg.openai_max_retries,
+        http_client=httpx.Client(**_http_client_kwargs(cfg)),
+    )
+
+
+def _build_async_client(cfg: AppConfig) -> AsyncOpenAI:
+    return AsyncOpenAI(
+        api_key=cfg.openai_api_key,
+        base_url=cfg.openai_base_url,
+        timeout=_timeout(cfg),
+        max_retries=cfg.openai_max_retries,
+        http_client=httpx.AsyncClient(**_http_client_kwargs(cfg)),
+    )
+
+
+def _timeout(cfg: AppConfig) -> httpx.Timeout:
+    return httpx.Timeout(cfg.openai_read_timeout, connect=cfg.openai_connect_timeout)
+
+
+def _http_client_kwargs(cfg: AppConfig) -> dict[str, Any]:
+    return {
+        "limits": httpx.Limits(
+            max_connections=cfg.openai_max_connections,
+            max_keepalive_connections=cfg.openai_max_keepalive_connections,
+            keepalive_expiry=cfg.openai_keepalive_expiry,
+        ),
+        "timeout": _timeout(cfg),
+        "http2": cfg.openai_http2,
+        "follow_redirects": True,
+    }
@@ -1,23 +1,92 @@
-"""Adapter to use a shared OpenAI client with CrewAI agents."""
+"""Adapter to use a shared OpenAI client with CrewAI agents.
+
+Transient failures (connection errors/timeouts, 5xx) are retried up to `max_retries`
+times with exponential backoff and full jitter. 429s are left to the rate limiter, which
+pauses the model and retries. Give the adapter clients built with `max_retries=0` (as
+`crew_scaffold` does) so SDK retries don't multiply with these. With `hedge=True`, a request
+still unanswered after the model's recent p95 attempt latency is duplicated, and the first
+successful answer wins. Latency percentiles, retries and hedge counts are kept per model
+(`llm_call_stats()`); compare p95/p99 with hedging on and off to see how much the tail shrinks.
+
+`stream_call` / `astream_call` yield content deltas as they arrive, so time-to-first-token
+(also tracked per model) is what the user waits for. Stream attempts that fail before the
+first content delta (while connecting or mid-way through the leading chunks) are retried.
+Once text has been yielded an error is raised instead. Streams are never hedged.
+"""
 
 from __future__ import annotations
 
-from typing import Any, List
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from itertools import chain
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, List, Optional, TypeVar
 
 from crewai.llms.base_llm import BaseLLM
-from openai import OpenAI
+from openai import APIConnectionError, AsyncOpenAI, InternalServerError, OpenAI
 from pydantic import BaseModel
 
+from src.main.rate_limiter import Priority, alimited_completion, estimate_tokens, get_rate_limiter, limited_completion
+
+# Errors worth retrying; APITimeoutError is a subclass of APIConnectionError. RateLimitError
+# is not here: `limited_completion` owns 429 handling.
+TRANSIENT_ERRORS = (APIConnectionError, InternalServerError)
+# Attempt latencies needed before hedging starts (p95 of fewer samples is noise).
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 512
+
+# Runs hedge attempts for sync callers; a losing attempt finishes in the background.
+_HEDGE_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+
+T = TypeVar("T")
+
 
 class OpenAIChatLLM(BaseLLM):
-    """Minimal adapter implementing CrewAI's BaseLLM interface."""
+    """Minimal adapter implementing CrewAI's BaseLLM interface.
+
+    Requests go through the shared rate limiter in the `priority` lane ("interactive" by
+    default, since agent replies are customer-facing).
+
+    Args:
+        max_retries: Retries after the first attempt for transient errors (0 disables).
+        backoff_base: Backoff cap for the first retry in seconds; doubles per retry.
+        backoff_max: Upper bound for any single backoff.
+        hedge: Send a duplicate request when the first is slower than `hedge_quantile`.
+        hedge_quantile: Quantile of recent attempt latencies used as the hedge delay.
+        stream: Make `call`/`acall` use streaming requests (joined before returning).
+    """
 
     is_litellm = False
 
-    def __init__(self, client: OpenAI, model: str = "gpt-4o-mini", temperature: float = 0.0):
+    def __init__(
+        self,
+        client: OpenAI,
+        model: str = "gpt-4o-mini",
+        temperature: float = 0.0,
+        async_client: Optional[AsyncOpenAI] = None,
+        priority: Priority = "interactive",
+        *,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        stream: bool = False,
+    ):
         super().__init__(model=model, temperature=temperature, api_key=None, base_url=None, provider="openai")
         self.client = client
+        self.async_client = async_client
         self.temperature = temperature
+        self.priority = priority
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.stream = stream
 
     def call(
         self,
@@ -30,11 +99,344 @@ class OpenAIChatLLM(BaseLLM):
         response_model: type[BaseModel] | None = None,
     ) -> str:
         """Generate a chat completion and return the text content."""
+        if self.stream:
+            return "".join(self.stream_call(messages))
+        request = self._request(messages)
+        stats = _stats_for(self.model)
+        start = time.perf_counter()
+        resp = self._with_retries(lambda: self._hedged(request, stats), stats)
+        stats.record_call(time.perf_counter() - start)
+        return resp.choices[0].message.content or ""
+
+    async def acall(
+        self,
+        messages: str | List[dict],
+        tools: List[dict] | None = None,
+        callbacks: List[Any] | None = None,
+        available_functions: dict[str, Any] | None = None,
+        from_task: Any = None,
+        from_agent: Any = None,
+        response_model: type[BaseModel] | None = None,
+    ) -> str:
+        """Async variant of `call`; requires `async_client`."""
+        if self.async_client is None:
+            raise RuntimeError("OpenAIChatLLM.acall requires an async_client.")
+        if self.stream:
+            return "".join([delta async for delta in self.astream_call(messages)])
+        request = self._request(messages)
+        stats = _stats_for(self.model)
+        start = time.perf_counter()
+        resp = await self._awith_retries(lambda: self._ahedged(request, stats), stats)
+        stats.record_call(time.perf_counter() - start)
+        return resp.choices[0].message.content or ""
+
+    def stream_call(self, messages: str | List[dict]) -> Iterator[str]:
+        """Yield the completion's content deltas as they arrive."""
+        request = self._stream_request(messages)
+        stats = _stats_for(self.model)
+        start = time.perf_counter()
+        chunks, head = self._with_retries(lambda: self._open_stream(request), stats)
+        usage = None
+        first = True
+        try:
+            for chunk in chain(head, chunks):
+                usage = getattr(chunk, "usage", None) or usage
+                delta = _delta(chunk)
+                if delta:
+                    if first:
+                        stats.record_first_token(time.perf_counter() - start)
+                        first = False
+                    yield delta
+        except Exception:
+            stats.count("errors")
+            raise
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        _settle_stream(request, usage)
+        stats.record_call(time.perf_counter() - start)
+
+    async def astream_call(self, messages: str | List[dict]) -> AsyncIterator[str]:
+        """Async `stream_call`; requires `async_client`."""
+        if self.async_client is None:
+            raise RuntimeError("OpenAIChatLLM.astream_call requires an async_client.")
+        request = self._stream_request(messages)
+        stats = _stats_for(self.model)
+        start = time.perf_counter()
+        chunks, head = await self._awith_retries(lambda: self._aopen_stream(request), stats)
+        usage = None
+        first = True
+        try:
+            async for chunk in _achain(head, chunks):
+                usage = getattr(chunk, "usage", None) or usage
+                delta = _delta(chunk)
+                if delta:
+                    if first:
+                        stats.record_first_token(time.perf_counter() - start)
+                        first = False
+                    yield delta
+        except Exception:
+            stats.count("errors")
+            raise
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                await close()
+        _settle_stream(request, usage)
+        stats.record_call(time.perf_counter() - start)
+
+    def _request(self, messages: str | List[dict]) -> dict:
         if isinstance(messages, str):
             messages = [{"role": "user", "content": messages}]
-        resp = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=self.temperature,
-        )
-        return resp.choices[0].message.content or ""
+        return {"model": self.model, "messages": messages, "temperature": self.temperature}
+
+    def _stream_request(self, messages: str | List[dict]) -> dict:
+        return {**self._request(messages), "stream": True, "stream_options": {"include_usage": True}}
+
+    def _open_stream(self, request: dict) -> tuple[Any, list]:
+        """Start a stream and read up to its first content delta, so retries cover that span.
+
+        Returns the stream and the chunks read so far (to be yielded before the rest).
+        """
+        chunks = limited_completion(self.client, request, priority=self.priority)
+        head: list = []
+        try:
+            for chunk in chunks:
+                head.append(chunk)
+                if _delta(chunk):
+                    break
+        except BaseException:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+            get_rate_limiter().settle(request["model"], estimate_tokens(request), 0)
+            raise
+        return chunks, head
+
+    async def _aopen_stream(self, request: dict) -> tuple[Any, list]:
+        chunks = await alimited_completion(self.async_client, request, priority=self.priority)
+        head: list = []
+        try:
+            async for chunk in chunks:
+                head.append(chunk)
+                if _delta(chunk):
+                    break
+        except BaseException:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                await close()
+            get_rate_limiter().settle(request["model"], estimate_tokens(request), 0)
+            raise
+        return chunks, head
+
+    def _with_retries(self, attempt_fn: Callable[[], T], stats: "_ModelStats") -> T:
+        attempt = 0
+        while True:
+            try:
+                return attempt_fn()
+            except TRANSIENT_ERRORS:
+                if attempt == self.max_retries:
+                    stats.count("errors")
+                    raise
+            except Exception:
+                stats.count("errors")
+                raise
+            stats.count("retries")
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+
+    async def _awith_retries(self, attempt_fn: Callable[[], Awaitable[T]], stats: "_ModelStats") -> T:
+        attempt = 0
+        while True:
+            try:
+                return await attempt_fn()
+            except TRANSIENT_ERRORS:
+                if attempt == self.max_retries:
+                    stats.count("errors")
+                    raise
+            except Exception:
+                stats.count("errors")
+                raise
+            stats.count("retries")
+            await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(backoff_max, backoff_base * 2**attempt)]."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _hedged(self, request: dict, stats: "_ModelStats") -> Any:
+        def send() -> Any:
+            return _timed(lambda: limited_completion(self.client, request, priority=self.priority), stats)
+
+        delay = stats.attempt_quantile(self.hedge_quantile) if self.hedge else None
+        if delay is None:
+            return send()
+        # The primary gets its own thread so it never queues behind other calls' hedges;
+        # only the hedge waits for a `_HEDGE_POOL` worker (and is dropped if still queued).
+        primary: Future = Future()
+        threading.Thread(target=_run_into, args=(primary, send), name="llm-primary", daemon=True).start()
+        done, _ = wait([primary], timeout=delay)
+        pending = {primary}
+        if not done:
+            stats.count("hedges")
+            pending.add(_HEDGE_POOL.submit(send))
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is not primary:
+                            stats.count("hedge_wins")
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def _ahedged(self, request: dict, stats: "_ModelStats") -> Any:
+        async def send() -> Any:
+            return await _atimed(
+                lambda: alimited_completion(self.async_client, request, priority=self.priority), stats
+            )
+
+        delay = stats.attempt_quantile(self.hedge_quantile) if self.hedge else None
+        if delay is None:
+            return await send()
+        primary = asyncio.ensure_future(send())
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        pending = {primary}
+        if not done:
+            stats.count("hedges")
+            pending.add(asyncio.ensure_future(send()))
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            stats.count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+def llm_call_stats() -> dict[str, dict[str, float]]:
+    """Per-model call counts, retries, hedges, call-latency and time-to-first-token percentiles (ms)."""
+    with _stats_lock:
+        models = dict(_stats)
+    return {model: stats.snapshot() for model, stats in models.items()}
+
+
+def reset_llm_call_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+class _ModelStats:
+    """Counters plus windows of attempt latencies (for hedge delays), call latencies and TTFTs."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "errors": 0, "retries": 0, "hedges": 0, "hedge_wins": 0}
+        self.attempts: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.calls: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.first_tokens: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def record_attempt(self, seconds: float) -> None:
+        with self._lock:
+            self.attempts.append(seconds)
+
+    def record_call(self, seconds: float) -> None:
+        with self._lock:
+            self.counters["calls"] += 1
+            self.calls.append(seconds)
+
+    def record_first_token(self, seconds: float) -> None:
+        with self._lock:
+            self.first_tokens.append(seconds)
+
+    def attempt_quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if len(self.attempts) < HEDGE_MIN_SAMPLES:
+                return None
+            return _quantile(sorted(self.attempts), q)
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            snap: dict[str, float] = dict(self.counters)
+            calls = sorted(self.calls)
+            first_tokens = sorted(self.first_tokens)
+        for label, q in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+            snap[label] = _quantile(calls, q) * 1000 if calls else 0.0
+        for label, q in (("ttft_p50_ms", 0.5), ("ttft_p95_ms", 0.95)):
+            snap[label] = _quantile(first_tokens, q) * 1000 if first_tokens else 0.0
+        return snap
+
+
+_stats: dict[str, _ModelStats] = {}
+_stats_lock = threading.Lock()
+
+
+def _stats_for(model: str) -> _ModelStats:
+    with _stats_lock:
+        stats = _stats.get(model)
+        if stats is None:
+            stats = _stats[model] = _ModelStats()
+        return stats
+
+
+def _quantile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _delta(chunk: Any) -> Optional[str]:
+    return chunk.choices[0].delta.content if chunk.choices else None
+
+
+async def _achain(head: list, chunks: Any) -> AsyncIterator[Any]:
+    for chunk in head:
+        yield chunk
+    async for chunk in chunks:
+        yield chunk
+
+
+def _settle_stream(request: dict, usage: Any) -> None:
+    """Streams return usage in their last chunk; settle the rate-limit reservation with it."""
+    total = getattr(usage, "total_tokens", None)
+    if isinstance(total, int):
+        get_rate_limiter().settle(request["model"], estimate_tokens(request), total)
+
+
+def _run_into(future: Future, fn: Callable[[], Any]) -> None:
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        future.set_result(fn())
+    except BaseException as exc:
+        future.set_exception(exc)
+
+
+def _timed(fn: Callable[[], T], stats: _ModelStats) -> T:
+    start = time.perf_counter()
+    result = fn()
+    stats.record_attempt(time.perf_counter() - start)
+    return result
+
+
+async def _atimed(fn: Callable[[], Awaitable[T]], stats: _ModelStats) -> T:
+    start = time.perf_counter()
+    result = await fn()
+    stats.record_attempt(time.perf_counter() - start)
+    return result
@@ -0,0 +1,351 @@
+"""Client-side rate limiting for OpenAI calls, keyed by model.
+
+Each model gets two token buckets, one for requests/minute and one for tokens/minute.
+Limits come from `config.RateLimitConfig` (OPENAI_RPM / OPENAI_TPM, plus per-model
+overrides in OPENAI_MODEL_RATE_LIMITS). A call reserves one request and its estimated prompt+completion
+tokens before it is sent. Once the response reports its real usage, the reservation is
+settled against it. Buckets hold `BURST_SECONDS` of budget, so a burst is spread over
+time instead of arriving all at once and tripping upstream 429s.
+
+Waiters queue per model in priority lanes. An "interactive" caller (a customer-facing
+reply) always goes before a waiting "batch" caller (re-triage, offline runs); each lane is
+first-come first-served. If a 429 still gets through, `limited_completion` pauses that
+model for the server's retry-after and retries, rather than handing the error to the caller.
+
+    completion = limited_completion(client, request, priority="batch")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Literal, Mapping, Optional, Tuple
+
+from openai import RateLimitError
+
+from src.main.config import RateLimitConfig, load_rate_limit_config
+
+Priority = Literal["interactive", "batch"]
+
+_LANES: dict[str, int] = {"interactive": 0, "batch": 1}
+
+# Seconds of rate a full bucket holds (the largest burst admitted at once).
+BURST_SECONDS = 10.0
+# Completion budget assumed when a request doesn't set max_tokens.
+DEFAULT_COMPLETION_TOKENS = 256
+# Extra 429 retries after the SDK's own retries are exhausted.
+RATE_LIMIT_RETRIES = 2
+# Pause applied on a 429 without a usable retry-after header.
+DEFAULT_RETRY_AFTER = 1.0
+# Poll interval for async waiters that are queued behind others.
+_ASYNC_POLL_SECONDS = 0.02
+
+
+class RateLimitTimeout(TimeoutError):
+    """Raised when a reservation cannot be made within the caller's timeout."""
+
+
+@dataclass
+class _Bucket:
+    rate: float  # units per second
+    capacity: float
+    level: float
+    updated: float
+
+    @classmethod
+    def per_minute(cls, limit: int, now: float) -> Optional["_Bucket"]:
+        if limit <= 0:
+            return None
+        rate = limit / 60.0
+        capacity = max(rate * BURST_SECONDS, 1.0)
+        return cls(rate, capacity, capacity, now)
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` can be taken; oversize amounts need a full bucket."""
+        needed = min(amount, self.capacity) - self.level
+        return max(needed, 0.0) / self.rate
+
+
+@dataclass
+class _ModelState:
+    requests: Optional[_Bucket]
+    tokens: Optional[_Bucket]
+    waiters: list = field(default_factory=list)  # heap of (lane, seq)
+    paused_until: float = 0.0
+    granted: int = 0
+    throttled: int = 0
+    wait_seconds: float = 0.0
+    tokens_reserved: int = 0
+    tokens_used: int = 0
+    rate_limit_errors: int = 0
+
+
+class RateLimiter:
+    """Per-model request and token buckets with priority lanes; see the module docstring."""
+
+    def __init__(
+        self,
+        *,
+        rpm: int = 500,
+        tpm: int = 200_000,
+        model_limits: Optional[Mapping[str, Tuple[int, int]]] = None,
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.model_limits = dict(model_limits or {})
+        self._cond = threading.Condition()
+        self._models: dict[str, _ModelState] = {}
+        self._seq = itertools.count()
+
+    @classmethod
+    def from_config(cls, cfg: Optional[RateLimitConfig] = None) -> "RateLimiter":
+        cfg = cfg or load_rate_limit_config()
+        return cls(rpm=cfg.openai_rpm, tpm=cfg.openai_tpm, model_limits=cfg.openai_model_rate_limits)
+
+    def acquire(
+        self,
+        model: str,
+        tokens: int,
+        *,
+        priority: Priority = "interactive",
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Block until `model` has room for one request of `tokens` tokens, then reserve it."""
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        with self._cond:
+            state, entry = self._enqueue(model, priority)
+            try:
+                while True:
+                    wait = self._try_take(state, entry, tokens, start)
+                    if wait is None:
+                        return
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise RateLimitTimeout(f"No {model} rate-limit capacity within {timeout}s.")
+                        wait = remaining if wait == float("inf") else min(wait, remaining)
+                    self._cond.wait(None if wait == float("inf") else wait)
+            except BaseException:
+                self._dequeue(state, entry)
+                raise
+
+    async def aacquire(
+        self,
+        model: str,
+        tokens: int,
+        *,
+        priority: Priority = "interactive",
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Async `acquire`: waits with `asyncio.sleep` so the event loop keeps running."""
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        with self._cond:
+            state, entry = self._enqueue(model, priority)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_take(state, entry, tokens, start)
+                if wait is None:
+                    return
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise RateLimitTimeout(f"No {model} rate-limit capacity within {timeout}s.")
+                await asyncio.sleep(min(wait, _ASYNC_POLL_SECONDS) if wait != float("inf") else _ASYNC_POLL_SECONDS)
+        except BaseException:
+            with self._cond:
+                self._dequeue(state, entry)
+            raise
+
+    def settle(self, model: str, reserved: int, used: Optional[int]) -> None:
+        """Replace a reservation's estimate with the tokens the response reports."""
+        if used is None:
+            return
+        with self._cond:
+            state = self._state(model)
+            state.tokens_used += used
+            if state.tokens is not None:
+                state.tokens.refill(time.monotonic())
+                state.tokens.level = min(state.tokens.capacity, state.tokens.level + reserved - used)
+            self._cond.notify_all()
+
+    def pause(self, model: str, seconds: float) -> None:
+        """Hold every caller for `model` for `seconds` (e.g., after a 429)."""
+        with self._cond:
+            state = self._state(model)
+            state.rate_limit_errors += 1
+            state.paused_until = max(state.paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Per-model counters: granted, throttled (had to wait), wait time, tokens, 429s, queue depth."""
+        with self._cond:
+            return {
+                model: {
+                    "granted": state.granted,
+                    "throttled": state.throttled,
+                    "wait_seconds": state.wait_seconds,
+                    "tokens_reserved": state.tokens_reserved,
+                    "tokens_used": state.tokens_used,
+                    "rate_limit_errors": state.rate_limit_errors,
+                    "queued": len(state.waiters),
+                }
+                for model, state in self._models.items()
+            }
+
+    def _state(self, model: str) -> _ModelState:
+        state = self._models.get(model)
+        if state is None:
+            rpm, tpm = self.model_limits.get(model, (self.rpm, self.tpm))
+            now = time.monotonic()
+            state = self._models[model] = _ModelState(_Bucket.per_minute(rpm, now), _Bucket.per_minute(tpm, now))
+        return state
+
+    def _enqueue(self, model: str, priority: Priority) -> tuple[_ModelState, tuple[int, int]]:
+        if priority not in _LANES:
+            raise ValueError(f"Unknown priority: {priority!r}")
+        state = self._state(model)
+        entry = (_LANES[priority], next(self._seq))
+        heapq.heappush(state.waiters, entry)
+        return state, entry
+
+    def _dequeue(self, state: _ModelState, entry: tuple[int, int]) -> None:
+        if entry in state.waiters:
+            state.waiters.remove(entry)
+            heapq.heapify(state.waiters)
+            self._cond.notify_all()
+
+    def _try_take(self, state: _ModelState, entry: tuple[int, int], tokens: int, start: float) -> Optional[float]:
+        """Reserve capacity if `entry` is at the head of the queue; else seconds to wait (inf = until notified)."""
+        if state.waiters[0] != entry:
+            return float("inf")
+        now = time.monotonic()
+        wait = max(state.paused_until - now, 0.0)
+        for bucket, amount in ((state.requests, 1), (state.tokens, tokens)):
+            if bucket is not None:
+                bucket.refill(now)
+                wait = max(wait, bucket.wait_for(amount))
+        if wait > 0:
+            return wait
+        for bucket, amount in ((state.requests, 1), (state.tokens, tokens)):
+            if bucket is not None:
+                bucket.level -= amount
+        heapq.heappop(state.waiters)
+        state.granted += 1
+        state.tokens_reserved += tokens
+        waited = now - start
+        if waited > 0.001:
+            state.throttled += 1
+            state.wait_seconds += waited
+        self._cond.notify_all()
+        return None
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter, built from `RateLimitConfig` on first use."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter.from_config()
+        return _limiter
+
+
+def set_rate_limiter(limiter: Optional[RateLimiter]) -> None:
+    """Replace the process-wide limiter (None rebuilds it from config on next use)."""
+    global _limiter
+    with _limiter_lock:
+        _limiter = limiter
+
+
+def estimate_tokens(request: Mapping[str, Any]) -> int:
+    """Rough prompt+completion token count for a chat request (~4 characters per token)."""
+    prompt = 0
+    for message in request.get("messages", ()):
+        content = message.get("content") or ""
+        if not isinstance(content, str):  # multi-part content
+            content = " ".join(str(part.get("text", "")) for part in content if isinstance(part, Mapping))
+        prompt += len(content) // 4 + 4  # + per-message framing
+    completion = request.get("max_completion_tokens") or request.get("max_tokens") or DEFAULT_COMPLETION_TOKENS
+    return prompt + completion
+
+
+def limited_completion(
+    client,
+    request: Mapping[str, Any],
+    *,
+    priority: Priority = "interactive",
+    limiter: Optional[RateLimiter] = None,
+) -> Any:
+    """`client.chat.completions.create(**request)` under the model's rate limit."""
+    limiter = limiter or get_rate_limiter()
+    model = request["model"]
+    tokens = estimate_tokens(request)
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        limiter.acquire(model, tokens, priority=priority)
+        try:
+            completion = client.chat.completions.create(**request)
+        except RateLimitError as exc:
+            limiter.settle(model, tokens, 0)
+            limiter.pause(model, _retry_after(exc))
+            if attempt == RATE_LIMIT_RETRIES:
+                raise
+            continue
+        except Exception:  # nothing was generated; give the tokens back
+            limiter.settle(model, tokens, 0)
+            raise
+        limiter.settle(model, tokens, _usage_tokens(completion))
+        return completion
+
+
+async def alimited_completion(
+    client,
+    request: Mapping[str, Any],
+    *,
+    priority: Priority = "interactive",
+    limiter: Optional[RateLimiter] = None,
+) -> Any:
+    """Async `limited_completion` for `AsyncOpenAI` clients."""
+    limiter = limiter or get_rate_limiter()
+    model = request["model"]
+    tokens = estimate_tokens(request)
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        await limiter.aacquire(model, tokens, priority=priority)
+        try:
+            completion = await client.chat.completions.create(**request)
+        except RateLimitError as exc:
+            limiter.settle(model, tokens, 0)
+            limiter.pause(model, _retry_after(exc))
+            if attempt == RATE_LIMIT_RETRIES:
+                raise
+            continue
+        except Exception:  # nothing was generated; give the tokens back
+            limiter.settle(model, tokens, 0)
+            raise
+        limiter.settle(model, tokens, _usage_tokens(completion))
+        return completion
+
+
+def _usage_tokens(completion: Any) -> Optional[int]:
+    usage = getattr(completion, "usage", None)
+    total = getattr(usage, "total_tokens", None)
+    return total if isinstance(total, int) else None
+
+
+def _retry_after(exc: RateLimitError) -> float:
+    response = getattr(exc, "response", None)
+    header = response.headers.get("retry-after") if response is not None else None
+    try:
+        return max(float(header), 0.0) if header is not None else DEFAULT_RETRY_AFTER
+    except ValueError:
+        return DEFAULT_RETRY_AFTER
@@ -0,0 +1,190 @@
+"""Content-addressed cache for structured LLM responses (e.g., classifier output).
+
+Entries are keyed on (normalized text, model, prompt version), so any prompt edit or model
+switch naturally misses. Two tiers are supported:
+- an in-memory LRU (always on), bounded by entry count and TTL;
+- an optional SQLite tier that survives restarts, bounded by row count and TTL.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n.!?,;:'\""
+# Size-based SQLite eviction runs every N puts rather than on each write.
+_SQLITE_TRIM_INTERVAL = 256
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, collapse whitespace and trim edge punctuation ("Thanks!" == "thanks")."""
+    return _WHITESPACE_RE.sub(" ", (text or "").lower()).strip(_EDGE_PUNCTUATION)
+
+
+def prompt_fingerprint(prompt: str) -> str:
+    """Short, stable version tag for a prompt string."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a `ResponseCache`."""
+
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    sqlite_hits: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + optional SQLite) cache for JSON-serializable payloads."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10_000,
+        ttl_seconds: Optional[float] = 24 * 3600,
+        sqlite_path: Optional[str | Path] = None,
+        sqlite_max_rows: int = 200_000,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1.")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_max_rows = sqlite_max_rows
+        self.stats = CacheStats()
+        self._memory: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts_since_trim = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        if sqlite_path is not None:
+            Path(sqlite_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_response_cache_created ON response_cache (created_at)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(text: str, *, model: str, prompt_version: str) -> str:
+        raw = "\x00".join((prompt_version, model, normalize_text(text)))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, text: str, *, model: str, prompt_version: str) -> Optional[dict]:
+        """Return the cached payload, or None on a miss or expired entry."""
+        key = self.make_key(text, model=model, prompt_version=prompt_version)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, payload = entry
+                if self._is_fresh(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.stats.hits += 1
+                    self.stats.memory_hits += 1
+                    return dict(payload)
+                del self._memory[key]
+                self.stats.expirations += 1
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT payload, created_at FROM response_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if self._is_fresh(row[1], now):
+                        payload = json.loads(row[0])
+                        self._remember(key, row[1], payload)
+                        self.stats.hits += 1
+                        self.stats.sqlite_hits += 1
+                        return dict(payload)
+                    self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self.stats.expirations += 1
+
+            self.stats.misses += 1
+            return None
+
+    def put(self, text: str, payload: dict, *, model: str, prompt_version: str) -> None:
+        """Store a payload in every configured tier."""
+        key = self.make_key(text, model=model, prompt_version=prompt_version)
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, dict(payload))
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, payload, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(payload), now),
+                )
+                self._puts_since_trim += 1
+                if self._puts_since_trim >= _SQLITE_TRIM_INTERVAL:
+                    self._trim_sqlite(now)
+                self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM response_cache")
+                self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _is_fresh(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is None or now - created_at < self.ttl_seconds
+
+    def _remember(self, key: str, created_at: float, payload: dict) -> None:
+        self._memory[key] = (created_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _trim_sqlite(self, now: float) -> None:
+        assert self._conn is not None
+        self._puts_since_trim = 0
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM response_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()
+        excess = count - self.sqlite_max_rows
+        if excess > 0:
+            self._conn.execute(
+                """
+                DELETE FROM response_cache WHERE key IN (
+                    SELECT key FROM response_cache ORDER BY created_at ASC LIMIT ?
+                )
+                """,
+                (excess,),
+            )
+            self.stats.evictions += excess
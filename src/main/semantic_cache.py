@@ -0,0 +1,160 @@
+"""Semantic cache: reuse classifications for messages that mean the same thing.
+
+Messages are embedded with sentence_transformers and searched in a FAISS inner-product
+index over normalized vectors (i.e., cosine similarity). A lookup whose nearest neighbour
+clears `threshold` reuses that neighbour's payload instead of calling the model.
+
+The index grows incrementally, evicts the least-recently-used entries in batches once it
+exceeds `max_entries`, and can be saved to / loaded from disk.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import faiss
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from src.main.config import DEFAULT_EMBEDDING_MODEL
+
+# Neighbours inspected per lookup, so entries from other namespaces don't hide a match.
+_SEARCH_K = 4
+
+
+@dataclass
+class SemanticCacheStats:
+    """Hit/miss counters for a `SemanticCache`."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class SemanticMatch:
+    """A cached payload plus the similarity of the message it was stored for."""
+
+    payload: dict
+    similarity: float
+
+
+class SemanticCache:
+    """FAISS-backed nearest-neighbour cache for JSON-serializable payloads."""
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.92,
+        max_entries: int = 50_000,
+        evict_fraction: float = 0.1,
+        index_path: Optional[str | Path] = None,
+        encoder: Optional[SentenceTransformer] = None,
+        embedding_model: str = DEFAULT_EMBEDDING_MODEL,
+    ):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1].")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.evict_fraction = evict_fraction
+        self.index_path = Path(index_path) if index_path else None
+        self.stats = SemanticCacheStats()
+        self._encoder = encoder or SentenceTransformer(embedding_model)
+        self._dim = self._encoder.get_sentence_embedding_dimension()
+        self._lock = threading.Lock()
+        # id -> {"namespace": ..., "payload": ...}, ordered least- to most-recently used.
+        self._entries: OrderedDict[int, dict] = OrderedDict()
+        self._next_id = 0
+        self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(self._dim))
+        if self.index_path and self._meta_path.exists():
+            self._load()
+
+    def lookup(self, text: str, *, namespace: str = "") -> Optional[SemanticMatch]:
+        """Return the closest cached payload in `namespace` above the threshold, if any."""
+        vector = self._embed(text)
+        with self._lock:
+            if self._index.ntotal == 0:
+                self.stats.misses += 1
+                return None
+            scores, ids = self._index.search(vector, min(_SEARCH_K, self._index.ntotal))
+            for score, entry_id in zip(scores[0], ids[0]):
+                if entry_id < 0 or score < self.threshold:
+                    break
+                entry = self._entries.get(int(entry_id))
+                if entry is not None and entry["namespace"] == namespace:
+                    self._entries.move_to_end(int(entry_id))
+                    self.stats.hits += 1
+                    return SemanticMatch(payload=dict(entry["payload"]), similarity=float(score))
+            self.stats.misses += 1
+            return None
+
+    def add(self, text: str, payload: dict, *, namespace: str = "") -> None:
+        """Index a message and the payload to reuse for its neighbours."""
+        vector = self._embed(text)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vector, np.array([entry_id], dtype="int64"))
+            self._entries[entry_id] = {"namespace": namespace, "payload": dict(payload)}
+            if len(self._entries) > self.max_entries:
+                self._evict()
+
+    def save(self, index_path: Optional[str | Path] = None) -> None:
+        """Persist the index and its metadata next to each other."""
+        path = Path(index_path) if index_path else self.index_path
+        if path is None:
+            raise ValueError("No index_path configured for SemanticCache.save.")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            faiss.write_index(self._index, str(path))
+            meta = {
+                "dim": self._dim,
+                "next_id": self._next_id,
+                "entries": [[entry_id, entry] for entry_id, entry in self._entries.items()],
+            }
+            self._meta_file(path).write_text(json.dumps(meta), encoding="utf-8")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def _meta_path(self) -> Path:
+        assert self.index_path is not None
+        return self._meta_file(self.index_path)
+
+    @staticmethod
+    def _meta_file(path: Path) -> Path:
+        return path.with_suffix(path.suffix + ".meta.json")
+
+    def _load(self) -> None:
+        meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+        if meta["dim"] != self._dim:
+            raise ValueError(
+                f"Semantic cache at {self.index_path} has dim {meta['dim']}, encoder produces {self._dim}."
+            )
+        self._index = faiss.read_index(str(self.index_path))
+        self._next_id = meta["next_id"]
+        self._entries = OrderedDict((int(entry_id), entry) for entry_id, entry in meta["entries"])
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = self._encoder.encode([text], normalize_embeddings=True, convert_to_numpy=True)
+        return np.asarray(vector, dtype="float32")
+
+    def _evict(self) -> None:
+        # Evict a batch at once: removal from a flat index is linear in its size.
+        count = max(1, int(len(self._entries) * self.evict_fraction))
+        victims = [entry_id for entry_id, _ in zip(self._entries, range(count))]
+        for entry_id in victims:
+            del self._entries[entry_id]
+        self._index.remove_ids(np.array(victims, dtype="int64"))
+        self.stats.evictions += len(victims)
@@ -1,29 +1,228 @@
-"""Lightweight SQLite-backed store for support tickets."""
+"""Lightweight SQLite-backed store for support tickets.
+
+The module-level functions are also the facade for pluggable backends: when config
+selects another `TicketStore` (see `ticket_store`), calls without an explicit `db_path`
+are forwarded to it, so callers never change.
+"""
 
 from __future__ import annotations
 
+import atexit
+import csv
+import hashlib
+import json
+import re
 import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Iterable, Iterator, Literal, Mapping, Optional, Sequence, Union
+
+if TYPE_CHECKING:
+    from src.main.ticket_store import TicketStore
 
 DB_PATH = Path("data/support.db")
 
+# sqlite3 caches compiled statements per connection, keyed by SQL text.
+STATEMENT_CACHE_SIZE = 64
+BUSY_TIMEOUT_MS = 5000
+# Applied to every new connection. WAL lets readers proceed while a writer commits,
+# busy_timeout makes concurrent writers wait instead of failing with "database is locked",
+# and synchronous=NORMAL is durable under WAL except for the last commits on power loss.
+PRAGMAS: dict[str, object] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": BUSY_TIMEOUT_MS,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64_000,  # negative = KiB, i.e. ~64 MB of page cache per connection
+    "temp_store": "MEMORY",
+}
 
-def init_db() -> None:
-    """Ensure the database and table exist."""
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute(
+_CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS support_tickets (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticket_number TEXT UNIQUE NOT NULL,
+        status TEXT NOT NULL,
+        message TEXT NOT NULL,
+        customer_name TEXT
+    )
+"""
+# Secondary indexes (name -> CREATE statement) that bulk imports drop and rebuild afterwards.
+_SECONDARY_INDEXES: dict[str, str] = {
+    "idx_support_tickets_status": (
+        "CREATE INDEX IF NOT EXISTS idx_support_tickets_status ON support_tickets (status, id)"
+    ),
+    "idx_support_tickets_customer": (
+        "CREATE INDEX IF NOT EXISTS idx_support_tickets_customer ON support_tickets (customer_name, id)"
+    ),
+}
+# External-content FTS5 index over message (Porter-stemmed); rowid = support_tickets.id.
+_FTS_TABLE_SQL = """
+    CREATE VIRTUAL TABLE support_tickets_fts USING fts5(
+        message,
+        content = 'support_tickets',
+        content_rowid = 'id',
+        tokenize = 'porter unicode61 remove_diacritics 2'
+    )
+"""
+# Triggers (name -> CREATE statement) syncing the FTS index on inserts, deletes and message
+# edits (status-only updates don't touch it); bulk imports drop them and rebuild the index.
+_FTS_TRIGGERS: dict[str, str] = {
+    "support_tickets_fts_insert": """
+        CREATE TRIGGER IF NOT EXISTS support_tickets_fts_insert AFTER INSERT ON support_tickets BEGIN
+            INSERT INTO support_tickets_fts (rowid, message) VALUES (new.id, new.message);
+        END
+    """,
+    "support_tickets_fts_delete": """
+        CREATE TRIGGER IF NOT EXISTS support_tickets_fts_delete AFTER DELETE ON support_tickets BEGIN
+            INSERT INTO support_tickets_fts (support_tickets_fts, rowid, message)
+            VALUES ('delete', old.id, old.message);
+        END
+    """,
+    "support_tickets_fts_update": """
+        CREATE TRIGGER IF NOT EXISTS support_tickets_fts_update AFTER UPDATE OF message ON support_tickets BEGIN
+            INSERT INTO support_tickets_fts (support_tickets_fts, rowid, message)
+            VALUES ('delete', old.id, old.message);
+            INSERT INTO support_tickets_fts (rowid, message) VALUES (new.id, new.message);
+        END
+    """,
+}
+_FTS_REBUILD_SQL = "INSERT INTO support_tickets_fts (support_tickets_fts) VALUES ('rebuild')"
+# Ordered (version, statements). Append new versions; never edit ones already shipped.
+_MIGRATIONS: list[tuple[int, tuple[str, ...]]] = [
+    (1, (_CREATE_TABLE_SQL,)),
+    (
+        2,
+        (
             """
-            CREATE TABLE IF NOT EXISTS support_tickets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                ticket_number TEXT UNIQUE NOT NULL,
-                status TEXT NOT NULL,
-                message TEXT NOT NULL,
-                customer_name TEXT
+            CREATE TABLE ticket_sequence (
+                name TEXT PRIMARY KEY,
+                next_value INTEGER NOT NULL,
+                seed INTEGER NOT NULL
             )
-            """
-        )
+            """,
+            "INSERT INTO ticket_sequence (name, next_value, seed) VALUES ('ticket_number', 0, abs(random()))",
+        ),
+    ),
+    (3, tuple(_SECONDARY_INDEXES.values())),
+    (4, (_FTS_TABLE_SQL, *_FTS_TRIGGERS.values(), _FTS_REBUILD_SQL)),
+]
+
+_INSERT_TICKET_SQL = """
+    INSERT INTO support_tickets (ticket_number, status, message, customer_name)
+    VALUES (?, ?, ?, ?)
+"""
+_UPSERT_TICKET_SQL = """
+    INSERT OR REPLACE INTO support_tickets (ticket_number, status, message, customer_name)
+    VALUES (?, ?, ?, ?)
+"""
+_TICKET_EXISTS_SQL = "SELECT 1 FROM support_tickets WHERE ticket_number = ?"
+_SELECT_STATUS_SQL = "SELECT status, customer_name FROM support_tickets WHERE ticket_number = ?"
+_EXPORT_SQL = "SELECT ticket_number, status, message, customer_name FROM support_tickets ORDER BY id"
+_UPDATE_STATUS_SQL = "UPDATE support_tickets SET status = ? WHERE ticket_number = ?"
+_COUNT_BY_STATUS_SQL = "SELECT status, COUNT(*) FROM support_tickets GROUP BY status"
+_TAKE_SEQUENCE_SQL = """
+    UPDATE ticket_sequence SET next_value = next_value + 1
+    WHERE name = 'ticket_number' AND next_value < ?
+    RETURNING next_value - 1, seed
+"""
+_TICKET_COLUMNS = "id, ticket_number, status, message, customer_name"
+# FTS5's `rank` column is bm25() (lower-is-better), computed once per matching row;
+# negate it so SearchHit.score is higher-is-better.
+_SEARCH_SQL = """
+    SELECT t.id, t.ticket_number, t.status, t.message, t.customer_name, -f.rank
+    FROM support_tickets_fts AS f
+    JOIN support_tickets AS t ON t.id = f.rowid
+    WHERE support_tickets_fts MATCH ?
+    ORDER BY f.rank
+    LIMIT ?
+"""
+_SEARCH_TERM_RE = re.compile(r"\w+")
+
+BULK_BATCH_SIZE = 50_000
+MAX_PAGE_SIZE = 500
+STATUS_CACHE_SIZE = 10_000
+STATUS_CACHE_TTL = 30.0  # seconds; bounds staleness from writers in other processes
+STATUS_NEGATIVE_TTL = 2.0  # seconds to remember "not found"
+TICKET_FIELDS = ("ticket_number", "status", "message", "customer_name")
+TICKET_NUMBER_MIN = 100000
+TICKET_NUMBER_SPACE = 900000  # all 6-digit numbers
+_FEISTEL_HALF_BITS = 10  # 2 * 10 bits = 1,048,576 >= TICKET_NUMBER_SPACE
+_FEISTEL_ROUNDS = 4
+
+Durability = Literal["buffered", "commit"]
+TicketRow = tuple[str, str, str, Optional[str]]  # (ticket_number, status, message, customer_name)
+TicketRecord = Union[Mapping[str, Optional[str]], Sequence[Optional[str]]]
+
+
+class TicketNumbersExhausted(RuntimeError):
+    """Raised when every number in the 6-digit space has been handed out."""
+
+
+@dataclass
+class BulkStats:
+    """Row count and wall time for a bulk import/export."""
+
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float(self.rows)
+
+
+@dataclass
+class Ticket:
+    """One row of `support_tickets`."""
+
+    id: int
+    ticket_number: str
+    status: str
+    message: str
+    customer_name: Optional[str]
+
+
+@dataclass
+class SearchHit:
+    """A `search_tickets` result; higher `score` (negated BM25) means more relevant."""
+
+    ticket: Ticket
+    score: float
+
+
+@dataclass
+class TicketPage:
+    """A page of tickets, newest first; pass `next_cursor` back to get the next page."""
+
+    tickets: list[Ticket]
+    next_cursor: Optional[int]
+
+
+_local = threading.local()
+_registry_lock = threading.Lock()
+_open_connections: set[sqlite3.Connection] = set()
+_migrated_paths: set[Path] = set()
+# Bumped by close_connections() so threads drop their (now closed) cached connections.
+_generation = 0
+_write_behind: Optional["_WriteBehind"] = None
+# Non-default backend selected via ticket_store (None means SQLite at DB_PATH).
+_backend: Optional["TicketStore"] = None
+_backend_resolved = False
+_backend_lock = threading.Lock()
+
+
+def init_db(*, db_path: Optional[Path] = None) -> None:
+    """Ensure the database exists and its schema is current (a no-op after the first call)."""
+    store = _delegate(db_path)
+    if store is not None:
+        store.init_db()
+        return
+    _connection(db_path)
 
 
 def create_ticket(
@@ -31,23 +230,793 @@ def create_ticket(
     message: str,
     status: str = "Unresolved",
     customer_name: Optional[str] = None,
+    *,
+    db_path: Optional[Path] = None,
 ) -> None:
-    """Insert or replace a ticket record."""
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO support_tickets (ticket_number, status, message, customer_name)
-            VALUES (?, ?, ?, ?)
-            """,
-            (ticket_number, status, message, customer_name),
+    """Insert a ticket record (queued instead when write-behind is enabled).
+
+    A plain INSERT: numbers from `allocate_ticket_number` never collide, so an existing
+    ticket is never overwritten. Raises `sqlite3.IntegrityError` if the ticket number
+    already exists; with write-behind the error surfaces from `flush()` (or from this call
+    with `durability="commit"`).
+    """
+    store = _delegate(db_path)
+    if store is not None:
+        store.create_ticket(ticket_number, message, status=status, customer_name=customer_name)
+        return
+    path = Path(db_path or DB_PATH)
+    row = (ticket_number, status, message, customer_name)
+    writer = _active_write_behind(path)
+    if writer is not None:
+        writer.submit(row)
+    else:
+        conn = _connection(path)
+        with conn:
+            conn.execute(_INSERT_TICKET_SQL, row)
+    _status_cache.put(path, ticket_number, (status, customer_name))
+
+
+def create_tickets(
+    rows: Sequence[TicketRow], *, db_path: Optional[Path] = None
+) -> list[Optional[sqlite3.IntegrityError]]:
+    """Insert several tickets in one transaction, bypassing write-behind.
+
+    Returns one entry per row: None if inserted, or the `IntegrityError` for a duplicate
+    (other rows still commit).
+    """
+    store = _delegate(db_path)
+    if store is not None:
+        return store.create_tickets(rows)
+    _await_write_behind()
+    path = Path(db_path or DB_PATH)
+    errors: list[Optional[sqlite3.IntegrityError]] = []
+    conn = _connection(path)
+    with conn:
+        for row in rows:
+            try:
+                conn.execute(_INSERT_TICKET_SQL, row)
+            except sqlite3.IntegrityError as exc:
+                errors.append(exc)
+            else:
+                errors.append(None)
+    for row, error in zip(rows, errors):
+        if error is None:
+            _status_cache.put(path, row[0], (row[1], row[3]))
+    return errors
+
+
+def get_ticket_status(
+    ticket_number: str, *, db_path: Optional[Path] = None
+) -> Optional[tuple[str, Optional[str]]]:
+    """Return (status, customer_name) for a ticket number, or None if not found.
+
+    Read-through cached in-process (LRU keyed by DB path and ticket number). Writes made
+    through this module update or invalidate the cache; "not found" results are cached
+    only for `STATUS_NEGATIVE_TTL`, so tickets created by other processes show up quickly.
+    """
+    store = _delegate(db_path)
+    if store is not None:
+        return store.get_ticket_status(ticket_number)
+    path = Path(db_path or DB_PATH)
+    writer = _active_write_behind(path)
+    if writer is not None:
+        pending = writer.pending(ticket_number)
+        if pending is not None:
+            return (pending[1], pending[3])
+    found, cached = _status_cache.get(path, ticket_number)
+    if found:
+        return cached
+    row = _connection(path).execute(_SELECT_STATUS_SQL, (ticket_number,)).fetchone()
+    result = (row[0], row[1]) if row else None
+    _status_cache.put(path, ticket_number, result)
+    return result
+
+
+def update_ticket_status(ticket_number: str, status: str, *, db_path: Optional[Path] = None) -> bool:
+    """Set a ticket's status; return False if the ticket does not exist."""
+    store = _delegate(db_path)
+    if store is not None:
+        return store.update_ticket_status(ticket_number, status)
+    _await_write_behind()
+    path = Path(db_path or DB_PATH)
+    conn = _connection(path)
+    with conn:
+        updated = conn.execute(_UPDATE_STATUS_SQL, (status, ticket_number)).rowcount
+    _status_cache.invalidate(path, ticket_number)
+    return updated > 0
+
+
+def list_tickets(
+    *,
+    status: Optional[str] = None,
+    customer_name: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[int] = None,
+    db_path: Optional[Path] = None,
+) -> TicketPage:
+    """List tickets newest first, optionally filtered by status and/or customer name.
+
+    `cursor` is the `next_cursor` of the previous page. Keyset pagination on id, over the
+    (status, id) and (customer_name, id) indexes, makes later pages cost the same as the first.
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+    store = _delegate(db_path)
+    if store is not None:
+        return store.list_tickets(status=status, customer_name=customer_name, limit=limit, cursor=cursor)
+    _await_write_behind()
+    clauses, params = [], []
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(status)
+    if customer_name is not None:
+        clauses.append("customer_name = ?")
+        params.append(customer_name)
+    if cursor is not None:
+        clauses.append("id < ?")
+        params.append(cursor)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    rows = _connection(db_path).execute(
+        f"SELECT {_TICKET_COLUMNS} FROM support_tickets {where} ORDER BY id DESC LIMIT ?",
+        (*params, limit + 1),
+    ).fetchall()
+    tickets = [Ticket(*row) for row in rows[:limit]]
+    next_cursor = tickets[-1].id if len(rows) > limit else None
+    return TicketPage(tickets=tickets, next_cursor=next_cursor)
+
+
+def count_tickets_by_status(*, db_path: Optional[Path] = None) -> dict[str, int]:
+    """Return {status: count}, answered from the status index."""
+    store = _delegate(db_path)
+    if store is not None:
+        return store.count_tickets_by_status()
+    _await_write_behind()
+    return dict(_connection(db_path).execute(_COUNT_BY_STATUS_SQL).fetchall())
+
+
+def search_tickets(query: str, limit: int = 20, *, db_path: Optional[Path] = None) -> list[SearchHit]:
+    """Return tickets matching every word of `query` (stemmed), best BM25 match first.
+
+    `query` is plain text: punctuation is dropped and FTS5 operators count as ordinary words.
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+    store = _delegate(db_path)
+    if store is not None:
+        return store.search_tickets(query, limit)
+    match = _match_expression(query)
+    if match is None:
+        return []
+    _await_write_behind()
+    rows = _connection(db_path).execute(_SEARCH_SQL, (match, limit)).fetchall()
+    return [SearchHit(Ticket(*row[:5]), row[5]) for row in rows]
+
+
+def allocate_ticket_number(*, db_path: Optional[Path] = None) -> str:
+    """Return a 6-digit ticket number that no other ticket in the database uses.
+
+    Numbers come from `draw_ticket_number`, so they look random but are found without
+    probing for free ones: O(1) per call, one sequence increment and one existence check.
+    Numbers already present (e.g., from older random allocation or imports) are skipped.
+    A database hands out at most `TICKET_NUMBER_SPACE` (900,000) numbers; after that this
+    raises `TicketNumbersExhausted`.
+    """
+    store = _delegate(db_path)
+    if store is not None:
+        return store.allocate_ticket_number()
+    conn = _connection(db_path)
+    while True:
+        candidate = draw_ticket_number(db_path=db_path)
+        if conn.execute(_TICKET_EXISTS_SQL, (candidate,)).fetchone() is None:
+            return candidate
+
+
+def draw_ticket_number(*, db_path: Optional[Path] = None) -> str:
+    """Draw the next number from the database's permuted sequence without checking for rows.
+
+    Each call takes the next value of the `ticket_sequence` table and maps it through a
+    keyed Feistel permutation of the 6-digit space, so numbers never repeat for a given
+    database. Callers that keep tickets elsewhere (e.g., in shards) check their own storage
+    for pre-existing rows.
+    """
+    value, seed = _next_sequence_value(_connection(db_path))
+    return str(TICKET_NUMBER_MIN + _permute(value, seed))
+
+
+def status_cache_stats() -> dict[str, float]:
+    """Hit/miss counters and current size of the `get_ticket_status` cache."""
+    return _status_cache.stats()
+
+
+def configure_status_cache(
+    *,
+    max_entries: int = STATUS_CACHE_SIZE,
+    ttl: float = STATUS_CACHE_TTL,
+    negative_ttl: float = STATUS_NEGATIVE_TTL,
+) -> None:
+    """Resize or retune the status cache (clearing it); `max_entries=0` disables caching."""
+    global _status_cache
+    _status_cache = _StatusCache(max_entries, ttl, negative_ttl)
+
+
+def clear_status_cache() -> None:
+    _status_cache.clear()
+
+
+def import_tickets(
+    source: Union[str, Path, Iterable[TicketRecord]],
+    *,
+    batch_size: int = BULK_BATCH_SIZE,
+    db_path: Optional[Path] = None,
+) -> BulkStats:
+    """Bulk insert-or-replace tickets from a `.csv`/`.jsonl` path or an iterable of records.
+
+    Records are mappings with `TICKET_FIELDS` keys (status defaults to "Unresolved") or
+    sequences in that order. Rows are committed `batch_size` at a time; secondary indexes
+    and the full-text triggers are dropped for the duration, and the indexes and FTS index
+    are rebuilt once at the end.
+    """
+    store = _delegate(db_path)
+    if store is not None:
+        return store.import_tickets(source, batch_size=batch_size)
+    rows = _ticket_rows(source)
+    _await_write_behind()
+    start = time.perf_counter()
+    total = 0
+    with _bulk_loading(Path(db_path or DB_PATH)) as conn:
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+            with conn:
+                conn.executemany(_UPSERT_TICKET_SQL, chunk)
+            total += len(chunk)
+    return BulkStats(rows=total, seconds=time.perf_counter() - start)
+
+
+def export_tickets(
+    path: Union[str, Path], *, batch_size: int = BULK_BATCH_SIZE, db_path: Optional[Path] = None
+) -> BulkStats:
+    """Stream every ticket, in insertion order, to a `.csv` or `.jsonl` file."""
+    store = _delegate(db_path)
+    if store is not None:
+        return store.export_tickets(path, batch_size=batch_size)
+    _await_write_behind()
+    start = time.perf_counter()
+    total = _write_ticket_file(path, _ticket_chunks(Path(db_path or DB_PATH), batch_size))
+    return BulkStats(rows=total, seconds=time.perf_counter() - start)
+
+
+def enable_write_behind(
+    *,
+    max_batch: int = 256,
+    max_delay: float = 0.05,
+    durability: Durability = "buffered",
+) -> None:
+    """Queue `create_ticket` inserts for the current `DB_PATH` and commit them in batches.
+
+    A background writer commits queued rows in one transaction per batch (by size or age);
+    `flush()` blocks until everything queued so far is on disk.
+
+    Args:
+        max_batch: Commit as soon as this many rows are queued.
+        max_delay: Commit rows that have waited this long (seconds), even if the batch is small.
+        durability: "buffered" returns once queued (a crash may lose up to one batch);
+            "commit" waits until the row's batch has committed.
+    """
+    global _write_behind
+    if durability not in ("buffered", "commit"):
+        raise ValueError(f"Unknown durability mode: {durability!r}")
+    disable_write_behind()
+    _write_behind = _WriteBehind(Path(DB_PATH), max_batch, max_delay, durability)
+
+
+def disable_write_behind() -> None:
+    """Flush pending rows, stop the background writer and return to direct writes."""
+    global _write_behind
+    writer, _write_behind = _write_behind, None
+    if writer is not None:
+        writer.stop()
+
+
+def flush(timeout: Optional[float] = None) -> None:
+    """Block until every ticket queued so far is committed; re-raise the last write error.
+
+    Errors are reported once: a later `flush()` only raises for rows that failed since.
+    Rows queued with `durability="commit"` report their error to the `create_ticket` call
+    that queued them instead.
+    """
+    if _write_behind is not None:
+        _write_behind.flush(timeout)
+
+
+def close_connections() -> None:
+    """Close every pooled connection across threads; later calls reconnect lazily."""
+    global _generation
+    with _registry_lock:
+        conns = list(_open_connections)
+        _open_connections.clear()
+        _migrated_paths.clear()
+        _generation += 1
+    for conn in conns:
+        conn.close()
+
+
+class _ThreadConnections:
+    """One thread's connections by path; held only by `_local`, so it is freed when the thread exits."""
+
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.connections: dict[Path, sqlite3.Connection] = {}
+        weakref.finalize(self, _close_thread_connections, self.connections)
+
+
+def _close_thread_connections(connections: dict[Path, sqlite3.Connection]) -> None:
+    """Finalizer for `_ThreadConnections`: release a dead thread's connections and their page caches."""
+    with _registry_lock:
+        conns = [conn for conn in connections.values() if conn in _open_connections]
+        _open_connections.difference_update(conns)
+    for conn in conns:
+        conn.close()
+
+
+def _connection(path: Optional[Path] = None) -> sqlite3.Connection:
+    """Return this thread's persistent connection to `path` (default: the current `DB_PATH`).
+
+    Reusing one connection per thread and path keeps sqlite3's prepared-statement cache
+    warm. `DB_PATH` is read on each call, so repointing it takes effect immediately. The
+    first connection to a path in this process applies pending migrations (`_migrate`);
+    connections are closed when their thread exits or by `close_connections()` (also at exit).
+    """
+    path = Path(path or DB_PATH)
+    holder = getattr(_local, "holder", None)
+    if holder is None or holder.generation != _generation:
+        holder = _local.holder = _ThreadConnections(_generation)
+    cached = holder.connections
+    conn = cached.get(path)
+    if conn is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # check_same_thread=False only so close_connections() and the thread-exit finalizer
+        # can close it; each connection is otherwise used by the thread that opened it.
+        conn = sqlite3.connect(
+            path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        _apply_pragmas(conn)
+        with _registry_lock:
+            _open_connections.add(conn)
+            if path not in _migrated_paths:
+                _migrate(conn)
+                _migrated_paths.add(path)
+        cached[path] = conn
+    return conn
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Apply pending `_MIGRATIONS`, recording them in `schema_version`.
+
+    BEGIN IMMEDIATE serializes this across processes.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+        current = row[0] or 0
+        for version, statements in _MIGRATIONS:
+            if version <= current:
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def _apply_pragmas(conn: sqlite3.Connection) -> None:
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    # Not a tuning knob: INSERT OR REPLACE only fires the FTS delete trigger with this on.
+    conn.execute("PRAGMA recursive_triggers = ON")
+
+
+def _next_sequence_value(conn: sqlite3.Connection) -> tuple[int, int]:
+    """Take one sequence value and the permutation seed; BEGIN IMMEDIATE keeps takers disjoint.
+
+    Values are consumed one at a time, so nothing is lost when a process exits.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(_TAKE_SEQUENCE_SQL, (TICKET_NUMBER_SPACE,)).fetchone()
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    if row is None:
+        raise TicketNumbersExhausted("Ticket number space exhausted; all 6-digit numbers are allocated.")
+    return row[0], row[1]
+
+
+def _permute(value: int, seed: int) -> int:
+    """Bijectively map [0, TICKET_NUMBER_SPACE) onto itself with a keyed Feistel network.
+
+    The network permutes 20-bit values; cycle-walking (re-applying it until the result is
+    in range) restricts that to the 6-digit space, taking ~1.2 rounds on average.
+    """
+    while True:
+        value = _feistel(value, seed)
+        if value < TICKET_NUMBER_SPACE:
+            return value
+
+
+def _feistel(value: int, seed: int) -> int:
+    mask = (1 << _FEISTEL_HALF_BITS) - 1
+    left, right = value >> _FEISTEL_HALF_BITS, value & mask
+    for round_no in range(_FEISTEL_ROUNDS):
+        digest = hashlib.blake2b(f"{seed}:{round_no}:{right}".encode(), digest_size=4).digest()
+        left, right = right, left ^ (int.from_bytes(digest, "big") & mask)
+    return (left << _FEISTEL_HALF_BITS) | right
+
+
+def _match_expression(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 MATCH expression (quoted terms, implicit AND), or None if empty."""
+    terms = _SEARCH_TERM_RE.findall(query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def _file_format(path: Path) -> Literal["csv", "jsonl"]:
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Unsupported ticket file format: {path.name} (use .csv or .jsonl)")
+
+
+def _ticket_rows(source: Union[str, Path, Iterable[TicketRecord]]) -> Iterator[TicketRow]:
+    """Normalized rows from a ticket file or records; an unsupported file type fails here, not mid-import."""
+    if isinstance(source, (str, Path)):
+        _file_format(Path(source))
+        return _coerce_rows(_read_ticket_file(source))
+    return _coerce_rows(source)
+
+
+@contextmanager
+def _bulk_loading(path: Path) -> Iterator[sqlite3.Connection]:
+    """Yield `path`'s connection with secondary indexes and FTS triggers dropped; rebuild them on exit."""
+    _status_cache.clear()
+    conn = _connection(path)
+    with conn:
+        for name in _SECONDARY_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        for name in _FTS_TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    try:
+        yield conn
+    finally:
+        try:
+            with conn:
+                for statement in _SECONDARY_INDEXES.values():
+                    conn.execute(statement)
+                for statement in _FTS_TRIGGERS.values():
+                    conn.execute(statement)
+                conn.execute(_FTS_REBUILD_SQL)
+        finally:
+            # Reads during the load may have re-cached pre-import values; drop them once it has committed.
+            _status_cache.clear()
+
+
+def _ticket_chunks(path: Path, batch_size: int) -> Iterator[list[TicketRow]]:
+    """Every row of `path` in insertion order, `batch_size` rows at a time."""
+    cursor = _connection(path).execute(_EXPORT_SQL)
+    while True:
+        chunk = cursor.fetchmany(batch_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _write_ticket_file(path: Union[str, Path], chunks: Iterable[Sequence[TicketRow]]) -> int:
+    """Write row chunks to a `.csv` or `.jsonl` file; return the number of rows written."""
+    path = Path(path)
+    fmt = _file_format(path)
+    total = 0
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        writer = csv.writer(fh) if fmt == "csv" else None
+        if writer is not None:
+            writer.writerow(TICKET_FIELDS)
+        for chunk in chunks:
+            if writer is not None:
+                writer.writerows(chunk)
+            else:
+                fh.writelines(json.dumps(dict(zip(TICKET_FIELDS, row))) + "\n" for row in chunk)
+            total += len(chunk)
+    return total
+
+
+def _read_ticket_file(path: Union[str, Path]) -> Iterator[Mapping[str, Optional[str]]]:
+    path = Path(path)
+    fmt = _file_format(path)
+    with open(path, encoding="utf-8", newline="") as fh:
+        if fmt == "csv":
+            yield from csv.DictReader(fh)
+        else:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _coerce_rows(records: Iterable[TicketRecord]) -> Iterator[TicketRow]:
+    for record in records:
+        if isinstance(record, Mapping):
+            ticket_number = record.get("ticket_number")
+            status = record.get("status") or "Unresolved"
+            message = record.get("message")
+            customer_name = record.get("customer_name") or None
+        else:
+            ticket_number, status, message, customer_name = (list(record) + [None] * 4)[:4]
+            status = status or "Unresolved"
+        if not ticket_number or message is None:
+            raise ValueError(f"Ticket record needs ticket_number and message: {record!r}")
+        yield (str(ticket_number), str(status), str(message), customer_name)
+
+
+class _StatusCache:
+    """Thread-safe LRU of (status, customer_name) with separate positive/negative TTLs."""
+
+    def __init__(self, max_entries: int, ttl: float, negative_ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: OrderedDict[tuple[Path, str], tuple[float, Optional[tuple[str, Optional[str]]]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+
+    def get(self, path: Path, ticket_number: str) -> tuple[bool, Optional[tuple[str, Optional[str]]]]:
+        """Return (found, value); `found` distinguishes a cached "not found" from a miss."""
+        key = (path, ticket_number)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    if value is None:
+                        self._negative_hits += 1
+                    return True, value
+                del self._entries[key]
+            self._misses += 1
+            return False, None
+
+    def put(self, path: Path, ticket_number: str, value: Optional[tuple[str, Optional[str]]]) -> None:
+        if self.max_entries <= 0:
+            return
+        ttl = self.ttl if value is not None else self.negative_ttl
+        key = (path, ticket_number)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path: Path, ticket_number: str) -> None:
+        with self._lock:
+            self._entries.pop((path, ticket_number), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "negative_hits": self._negative_hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+            }
+
+
+_status_cache = _StatusCache(STATUS_CACHE_SIZE, STATUS_CACHE_TTL, STATUS_NEGATIVE_TTL)
+
+
+def _await_write_behind() -> None:
+    """Wait until queued tickets are committed so a read sees them; errors are left for `flush()`."""
+    writer = _write_behind
+    if writer is not None:
+        writer.wait(None)
+
+
+def _active_write_behind(path: Path) -> Optional["_WriteBehind"]:
+    writer = _write_behind
+    return writer if writer is not None and writer.path == path else None
+
+
+def _delegate(db_path: Optional[Path]) -> Optional["TicketStore"]:
+    """Return the configured non-default backend, or None to use SQLite at `DB_PATH`.
+
+    Calls with an explicit `db_path` (as made by `SQLiteTicketStore`) always use SQLite.
+    The backend is resolved from config on first use; see `ticket_store`.
+    """
+    global _backend, _backend_resolved
+    if db_path is not None:
+        return None
+    if not _backend_resolved:
+        with _backend_lock:  # concurrent first calls must agree on one backend instance
+            if not _backend_resolved:
+                from src.main.ticket_store import configured_backend  # ticket_store imports this module
+
+                _backend = configured_backend()
+                _backend_resolved = True
+    return _backend
+
+
+class _WriteBehind:
+    """Background thread that commits queued ticket rows in batched transactions."""
+
+    def __init__(self, path: Path, max_batch: int, max_delay: float, durability: Durability):
+        self.path = path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.durability = durability
+        self._cond = threading.Condition()
+        self._queue: list[tuple[int, TicketRow]] = []
+        self._pending: dict[str, TicketRow] = {}
+        self._oldest: Optional[float] = None
+        self._enqueued = 0  # sequence number of the last queued row
+        self._committed = 0  # sequence number of the last committed row
+        self._flush_requested = False
+        self._stopping = False
+        # seq -> error for buffered rows that failed to commit; flush() reports and clears them.
+        self._failures: dict[int, BaseException] = {}
+        # seq -> error for commit-mode rows, claimed only by the create_ticket call that queued it.
+        self._row_errors: dict[int, BaseException] = {}
+        self._thread = threading.Thread(target=self._run, name="ticket-write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, row: TicketRow) -> None:
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("Write-behind queue is stopped.")
+            self._enqueued += 1
+            seq = self._enqueued
+            self._queue.append((seq, row))
+            self._pending[row[0]] = row
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._cond.notify_all()
+        if self.durability == "commit":
+            self._wait_for(seq, None)
+            with self._cond:
+                error = self._row_errors.pop(seq, None)
+            if error is not None:
+                raise error
+
+    def pending(self, ticket_number: str) -> Optional[TicketRow]:
+        with self._cond:
+            return self._pending.get(ticket_number)
+
+    def flush(self, timeout: Optional[float]) -> None:
+        self.wait(timeout)
+        self._raise_failures()
+
+    def wait(self, timeout: Optional[float]) -> None:
+        """Commit everything queued so far and wait for it, without touching recorded failures."""
+        with self._cond:
+            seq = self._enqueued
+            self._flush_requested = True
+            self._cond.notify_all()
+        self._wait_for(seq, timeout)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._raise_failures()
+
+    def _wait_for(self, seq: int, timeout: Optional[float]) -> None:
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._committed >= seq, timeout):
+                raise TimeoutError("Timed out waiting for queued tickets to commit.")
+
+    def _raise_failures(self) -> None:
+        with self._cond:
+            failures, self._failures = self._failures, {}
+        if failures:
+            last_error = failures[max(failures)]
+            raise RuntimeError(f"{len(failures)} queued ticket(s) failed to commit.") from last_error
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._ready():
+                    if self._stopping and not self._queue:
+                        return
+                    wait = None if self._oldest is None else self._oldest + self.max_delay - time.monotonic()
+                    self._cond.wait(timeout=wait)
+                batch, self._queue = self._queue, []
+                self._oldest = None
+                self._flush_requested = False
+                last_seq = self._enqueued
+            failures = self._write(batch)
+            with self._cond:
+                for seq, row in batch:
+                    if self._pending.get(row[0]) is row:
+                        del self._pending[row[0]]
+                    if seq in failures:  # drop the optimistic write-through entry
+                        _status_cache.invalidate(self.path, row[0])
+                if self.durability == "commit":
+                    self._row_errors.update(failures)
+                else:
+                    self._failures.update(failures)
+                self._committed = last_seq
+                self._cond.notify_all()
+
+    def _write(self, batch: list[tuple[int, TicketRow]]) -> dict[int, BaseException]:
+        """Commit a batch in one transaction; on a duplicate, retry row by row to isolate it."""
+        try:
+            conn = _connection(self.path)
+            with conn:
+                conn.executemany(_INSERT_TICKET_SQL, [row for _, row in batch])
+            return {}
+        except sqlite3.IntegrityError:
+            pass
+        except BaseException as exc:  # surfaced to the next flush()/commit-mode caller
+            return {seq: exc for seq, _ in batch}
+        failures: dict[int, BaseException] = {}
+        try:
+            with conn:
+                for seq, row in batch:
+                    try:
+                        conn.execute(_INSERT_TICKET_SQL, row)
+                    except sqlite3.IntegrityError as exc:
+                        failures[seq] = exc
+        except BaseException as exc:
+            return {seq: exc for seq, _ in batch}
+        return failures
+
+    def _ready(self) -> bool:
+        if not self._queue:
+            return False
+        return (
+            self._stopping
+            or self._flush_requested
+            or len(self._queue) >= self.max_batch
+            or time.monotonic() - self._oldest >= self.max_delay
         )
 
 
-def get_ticket_status(ticket_number: str) -> Optional[tuple[str, Optional[str]]]:
-    """Return (status, customer_name) for a ticket number, or None if not found."""
-    with sqlite3.connect(DB_PATH) as conn:
-        row = conn.execute(
-            "SELECT status, customer_name FROM support_tickets WHERE ticket_number = ?",
-            (ticket_number,),
-        ).fetchone()
-    return (row[0], row[1]) if row else None
+def _shutdown() -> None:
+    disable_write_behind()
+    close_connections()
+
+
+atexit.register(_shutdown)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bulk import/export support tickets (CSV or JSONL).")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("path")
+    parser.add_argument("--db", help="SQLite file to use instead of the configured ticket store")
+    args = parser.parse_args()
+
+    db = Path(args.db) if args.db else None
+    bulk = import_tickets if args.action == "import" else export_tickets
+    stats = bulk(args.path, db_path=db)
+    print(f"{args.action}: {stats.rows} rows in {stats.seconds:.2f}s ({stats.rows_per_sec:,.0f} rows/sec)")
@@ -0,0 +1,440 @@
+"""Pluggable ticket-store backends behind the `support_store` facade.
+
+Backends:
+- `SQLiteTicketStore`: one SQLite file (the default, `data/support.db`).
+- `InMemoryTicketStore`: dict-backed, for tests and benchmarks.
+- `ShardedTicketStore`: several SQLite files partitioned by ticket-number prefix.
+
+The backend is chosen by `TicketStoreConfig` (TICKET_STORE_BACKEND=sqlite|memory|sharded,
+TICKET_STORE_PATH, TICKET_STORE_SHARDS) the first time `support_store` is used, or in
+code with `set_ticket_store`. Callers such as `crew_scaffold` keep importing the
+`support_store` functions and need no changes.
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import ExitStack
+from dataclasses import replace
+from itertools import chain, islice
+from pathlib import Path
+from typing import Iterable, Optional, Protocol, Sequence, Union, runtime_checkable
+
+from src.main import support_store
+from src.main.config import load_store_config
+from src.main.support_store import (
+    BULK_BATCH_SIZE,
+    MAX_PAGE_SIZE,
+    TICKET_NUMBER_MIN,
+    TICKET_NUMBER_SPACE,
+    BulkStats,
+    SearchHit,
+    Ticket,
+    TicketNumbersExhausted,
+    TicketPage,
+    TicketRecord,
+    TicketRow,
+)
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+@runtime_checkable
+class TicketStore(Protocol):
+    """Operations every ticket backend provides."""
+
+    def init_db(self) -> None: ...
+
+    def create_ticket(
+        self,
+        ticket_number: str,
+        message: str,
+        status: str = "Unresolved",
+        customer_name: Optional[str] = None,
+    ) -> None: ...
+
+    def create_tickets(self, rows: Sequence[TicketRow]) -> list[Optional[sqlite3.IntegrityError]]: ...
+
+    def get_ticket_status(self, ticket_number: str) -> Optional[tuple[str, Optional[str]]]: ...
+
+    def update_ticket_status(self, ticket_number: str, status: str) -> bool: ...
+
+    def list_tickets(
+        self,
+        *,
+        status: Optional[str] = None,
+        customer_name: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[int] = None,
+    ) -> TicketPage: ...
+
+    def count_tickets_by_status(self) -> dict[str, int]: ...
+
+    def search_tickets(self, query: str, limit: int = 20) -> list[SearchHit]: ...
+
+    def allocate_ticket_number(self) -> str: ...
+
+    def import_tickets(
+        self, source: Union[str, Path, Iterable[TicketRecord]], *, batch_size: int = BULK_BATCH_SIZE
+    ) -> BulkStats: ...
+
+    def export_tickets(self, path: Union[str, Path], *, batch_size: int = BULK_BATCH_SIZE) -> BulkStats: ...
+
+
+class SQLiteTicketStore:
+    """A single SQLite database, via the `support_store` implementation."""
+
+    def __init__(self, db_path: str | Path = support_store.DB_PATH):
+        self.db_path = Path(db_path)
+
+    def init_db(self) -> None:
+        support_store.init_db(db_path=self.db_path)
+
+    def create_ticket(
+        self,
+        ticket_number: str,
+        message: str,
+        status: str = "Unresolved",
+        customer_name: Optional[str] = None,
+    ) -> None:
+        support_store.create_ticket(ticket_number, message, status, customer_name, db_path=self.db_path)
+
+    def create_tickets(self, rows: Sequence[TicketRow]) -> list[Optional[sqlite3.IntegrityError]]:
+        return support_store.create_tickets(rows, db_path=self.db_path)
+
+    def get_ticket_status(self, ticket_number: str) -> Optional[tuple[str, Optional[str]]]:
+        return support_store.get_ticket_status(ticket_number, db_path=self.db_path)
+
+    def update_ticket_status(self, ticket_number: str, status: str) -> bool:
+        return support_store.update_ticket_status(ticket_number, status, db_path=self.db_path)
+
+    def list_tickets(
+        self,
+        *,
+        status: Optional[str] = None,
+        customer_name: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[int] = None,
+    ) -> TicketPage:
+        return support_store.list_tickets(
+            status=status, customer_name=customer_name, limit=limit, cursor=cursor, db_path=self.db_path
+        )
+
+    def count_tickets_by_status(self) -> dict[str, int]:
+        return support_store.count_tickets_by_status(db_path=self.db_path)
+
+    def search_tickets(self, query: str, limit: int = 20) -> list[SearchHit]:
+        return support_store.search_tickets(query, limit, db_path=self.db_path)
+
+    def allocate_ticket_number(self) -> str:
+        return support_store.allocate_ticket_number(db_path=self.db_path)
+
+    def import_tickets(
+        self, source: Union[str, Path, Iterable[TicketRecord]], *, batch_size: int = BULK_BATCH_SIZE
+    ) -> BulkStats:
+        return support_store.import_tickets(source, batch_size=batch_size, db_path=self.db_path)
+
+    def export_tickets(self, path: Union[str, Path], *, batch_size: int = BULK_BATCH_SIZE) -> BulkStats:
+        return support_store.export_tickets(path, batch_size=batch_size, db_path=self.db_path)
+
+
+class InMemoryTicketStore:
+    """Process-local, thread-safe store with the same semantics as SQLite (no persistence)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tickets: dict[str, Ticket] = {}
+        self._next_id = 1
+
+    def init_db(self) -> None:
+        pass
+
+    def create_ticket(
+        self,
+        ticket_number: str,
+        message: str,
+        status: str = "Unresolved",
+        customer_name: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            self._insert((ticket_number, status, message, customer_name))
+
+    def create_tickets(self, rows: Sequence[TicketRow]) -> list[Optional[sqlite3.IntegrityError]]:
+        errors: list[Optional[sqlite3.IntegrityError]] = []
+        with self._lock:
+            for row in rows:
+                try:
+                    self._insert(row)
+                except sqlite3.IntegrityError as exc:
+                    errors.append(exc)
+                else:
+                    errors.append(None)
+        return errors
+
+    def get_ticket_status(self, ticket_number: str) -> Optional[tuple[str, Optional[str]]]:
+        ticket = self._tickets.get(ticket_number)
+        return (ticket.status, ticket.customer_name) if ticket else None
+
+    def update_ticket_status(self, ticket_number: str, status: str) -> bool:
+        with self._lock:
+            ticket = self._tickets.get(ticket_number)
+            if ticket is None:
+                return False
+            ticket.status = status
+            return True
+
+    def list_tickets(
+        self,
+        *,
+        status: Optional[str] = None,
+        customer_name: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[int] = None,
+    ) -> TicketPage:
+        with self._lock:
+            matches = [
+                ticket
+                for ticket in self._tickets.values()
+                if (status is None or ticket.status == status)
+                and (customer_name is None or ticket.customer_name == customer_name)
+                and (cursor is None or ticket.id < cursor)
+            ]
+        matches.sort(key=lambda ticket: ticket.id, reverse=True)
+        tickets = [replace(ticket) for ticket in matches[:limit]]  # snapshots, as SQLite returns
+        next_cursor = tickets[-1].id if len(matches) > limit else None
+        return TicketPage(tickets=tickets, next_cursor=next_cursor)
+
+    def count_tickets_by_status(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        with self._lock:
+            for ticket in self._tickets.values():
+                counts[ticket.status] = counts.get(ticket.status, 0) + 1
+        return counts
+
+    def search_tickets(self, query: str, limit: int = 20) -> list[SearchHit]:
+        """Case-insensitive all-words match scored by term count (no stemming or BM25)."""
+        terms = [term.lower() for term in _WORD_RE.findall(query)]
+        if not terms:
+            return []
+        hits = []
+        with self._lock:
+            for ticket in self._tickets.values():
+                words = [word.lower() for word in _WORD_RE.findall(ticket.message)]
+                if all(term in words for term in terms):
+                    hits.append(SearchHit(replace(ticket), float(sum(words.count(term) for term in terms))))
+        return heapq.nlargest(limit, hits, key=lambda hit: (hit.score, hit.ticket.id))
+
+    def allocate_ticket_number(self) -> str:
+        with self._lock:
+            if len(self._tickets) >= TICKET_NUMBER_SPACE // 2:
+                raise TicketNumbersExhausted("InMemoryTicketStore is meant for tests; ticket space is too full.")
+            while True:
+                candidate = str(TICKET_NUMBER_MIN + secrets.randbelow(TICKET_NUMBER_SPACE))
+                if candidate not in self._tickets:
+                    return candidate
+
+    def import_tickets(
+        self, source: Union[str, Path, Iterable[TicketRecord]], *, batch_size: int = BULK_BATCH_SIZE
+    ) -> BulkStats:
+        """Insert-or-replace like SQLite: a replaced ticket gets a new id."""
+        rows = support_store._ticket_rows(source)
+        start = time.perf_counter()
+        total = 0
+        with self._lock:
+            for row in rows:
+                self._tickets.pop(row[0], None)
+                self._insert(row)
+                total += 1
+        return BulkStats(rows=total, seconds=time.perf_counter() - start)
+
+    def export_tickets(self, path: Union[str, Path], *, batch_size: int = BULK_BATCH_SIZE) -> BulkStats:
+        start = time.perf_counter()
+        with self._lock:
+            tickets = sorted(self._tickets.values(), key=lambda ticket: ticket.id)
+        rows = [(t.ticket_number, t.status, t.message, t.customer_name) for t in tickets]
+        total = support_store._write_ticket_file(path, [rows])
+        return BulkStats(rows=total, seconds=time.perf_counter() - start)
+
+    def _insert(self, row: TicketRow) -> None:
+        ticket_number, status, message, customer_name = row
+        if ticket_number in self._tickets:
+            raise sqlite3.IntegrityError(f"UNIQUE constraint failed: support_tickets.ticket_number ({ticket_number})")
+        self._tickets[ticket_number] = Ticket(self._next_id, ticket_number, status, message, customer_name)
+        self._next_id += 1
+
+
+class ShardedTicketStore:
+    """SQLite shards partitioned by ticket-number prefix (first two digits modulo shard count).
+
+    Numbers that don't start with two digits (e.g. imported "T000001") go to the shard
+    picked by their CRC-32 instead, so any string routes to a stable shard.
+
+    Shard files live next to `base_path` as `<stem>-shard<N><suffix>`. Ticket numbers are
+    drawn from shard 0's sequence, so they are unique across shards. Listings merge shards
+    on a global key (`local_id * shards + shard`), used as `Ticket.id` and cursor; pages are
+    newest first within each shard, interleaved across shards.
+    """
+
+    def __init__(self, base_path: str | Path = support_store.DB_PATH, shards: int = 4):
+        if shards < 1:
+            raise ValueError("shards must be >= 1.")
+        base = Path(base_path)
+        self.shards = [
+            SQLiteTicketStore(base.with_name(f"{base.stem}-shard{index}{base.suffix}")) for index in range(shards)
+        ]
+
+    def shard_for(self, ticket_number: str) -> SQLiteTicketStore:
+        prefix = ticket_number[:2]
+        key = int(prefix) if len(prefix) == 2 and prefix.isdecimal() else zlib.crc32(ticket_number.encode("utf-8"))
+        return self.shards[key % len(self.shards)]
+
+    def init_db(self) -> None:
+        for shard in self.shards:
+            shard.init_db()
+
+    def create_ticket(
+        self,
+        ticket_number: str,
+        message: str,
+        status: str = "Unresolved",
+        customer_name: Optional[str] = None,
+    ) -> None:
+        self.shard_for(ticket_number).create_ticket(ticket_number, message, status, customer_name)
+
+    def create_tickets(self, rows: Sequence[TicketRow]) -> list[Optional[sqlite3.IntegrityError]]:
+        by_shard: dict[int, list[int]] = {}
+        for position, row in enumerate(rows):
+            by_shard.setdefault(self.shards.index(self.shard_for(row[0])), []).append(position)
+        errors: list[Optional[sqlite3.IntegrityError]] = [None] * len(rows)
+        for shard_index, positions in by_shard.items():
+            shard_errors = self.shards[shard_index].create_tickets([rows[p] for p in positions])
+            for position, error in zip(positions, shard_errors):
+                errors[position] = error
+        return errors
+
+    def get_ticket_status(self, ticket_number: str) -> Optional[tuple[str, Optional[str]]]:
+        return self.shard_for(ticket_number).get_ticket_status(ticket_number)
+
+    def update_ticket_status(self, ticket_number: str, status: str) -> bool:
+        return self.shard_for(ticket_number).update_ticket_status(ticket_number, status)
+
+    def list_tickets(
+        self,
+        *,
+        status: Optional[str] = None,
+        customer_name: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[int] = None,
+    ) -> TicketPage:
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+        count = len(self.shards)
+        candidates: list[Ticket] = []
+        for index, shard in enumerate(self.shards):
+            # Global key = local_id * count + index, so key < cursor <=> local_id < ceil((cursor - index) / count).
+            local_cursor = None if cursor is None else -(-(cursor - index) // count)
+            if local_cursor is not None and local_cursor <= 0:
+                continue
+            page = shard.list_tickets(status=status, customer_name=customer_name, limit=limit, cursor=local_cursor)
+            candidates.extend(self._global_ticket(ticket, index) for ticket in page.tickets)
+        merged = heapq.nlargest(limit + 1, candidates, key=lambda ticket: ticket.id)
+        tickets = merged[:limit]
+        next_cursor = tickets[-1].id if len(merged) > limit else None
+        return TicketPage(tickets=tickets, next_cursor=next_cursor)
+
+    def count_tickets_by_status(self) -> dict[str, int]:
+        totals: dict[str, int] = {}
+        for shard in self.shards:
+            for status, count in shard.count_tickets_by_status().items():
+                totals[status] = totals.get(status, 0) + count
+        return totals
+
+    def search_tickets(self, query: str, limit: int = 20) -> list[SearchHit]:
+        """Top `limit` hits per shard merged by score (BM25 statistics are per shard)."""
+        hits = [
+            SearchHit(self._global_ticket(hit.ticket, index), hit.score)
+            for index, shard in enumerate(self.shards)
+            for hit in shard.search_tickets(query, limit)
+        ]
+        return heapq.nlargest(limit, hits, key=lambda hit: hit.score)
+
+    def allocate_ticket_number(self) -> str:
+        sequence_path = self.shards[0].db_path
+        while True:
+            candidate = support_store.draw_ticket_number(db_path=sequence_path)
+            if self.shard_for(candidate).get_ticket_status(candidate) is None:
+                return candidate
+
+    def import_tickets(
+        self, source: Union[str, Path, Iterable[TicketRecord]], *, batch_size: int = BULK_BATCH_SIZE
+    ) -> BulkStats:
+        """Route each chunk's rows to their shards; every shard rebuilds its indexes once at the end."""
+        rows = support_store._ticket_rows(source)
+        start = time.perf_counter()
+        total = 0
+        with ExitStack() as stack:
+            conns = [stack.enter_context(support_store._bulk_loading(shard.db_path)) for shard in self.shards]
+            while True:
+                chunk = list(islice(rows, batch_size))
+                if not chunk:
+                    break
+                by_shard: dict[int, list[TicketRow]] = {}
+                for row in chunk:
+                    by_shard.setdefault(self.shards.index(self.shard_for(row[0])), []).append(row)
+                for index, shard_rows in by_shard.items():
+                    with conns[index]:
+                        conns[index].executemany(support_store._UPSERT_TICKET_SQL, shard_rows)
+                total += len(chunk)
+        return BulkStats(rows=total, seconds=time.perf_counter() - start)
+
+    def export_tickets(self, path: Union[str, Path], *, batch_size: int = BULK_BATCH_SIZE) -> BulkStats:
+        """Shard by shard, each in insertion order."""
+        start = time.perf_counter()
+        chunks = chain.from_iterable(support_store._ticket_chunks(shard.db_path, batch_size) for shard in self.shards)
+        total = support_store._write_ticket_file(path, chunks)
+        return BulkStats(rows=total, seconds=time.perf_counter() - start)
+
+    def _global_ticket(self, ticket: Ticket, index: int) -> Ticket:
+        return Ticket(
+            ticket.id * len(self.shards) + index, ticket.ticket_number, ticket.status, ticket.message, ticket.customer_name
+        )
+
+
+
+def build_ticket_store(backend: str, *, path: Optional[str | Path] = None, shards: int = 4) -> TicketStore:
+    """Construct a backend by name ("sqlite", "memory" or "sharded")."""
+    if backend == "sqlite":
+        return SQLiteTicketStore(path or support_store.DB_PATH)
+    if backend == "memory":
+        return InMemoryTicketStore()
+    if backend == "sharded":
+        return ShardedTicketStore(path or support_store.DB_PATH, shards=shards)
+    raise ValueError(f"Unknown ticket store backend: {backend!r}")
+
+
+def set_ticket_store(store: Optional[TicketStore]) -> None:
+    """Route the `support_store` functions to `store` (None restores SQLite at `DB_PATH`)."""
+    with support_store._backend_lock:
+        support_store._backend = store
+        support_store._backend_resolved = True
+
+
+def configured_backend() -> Optional[TicketStore]:
+    """Backend selected by `TicketStoreConfig`; None keeps the built-in SQLite path.
+
+    For the default "sqlite" backend a configured path simply repoints `DB_PATH`, so the
+    facade keeps its direct (non-delegating) fast path.
+    """
+    cfg = load_store_config()
+    if cfg.ticket_store_backend == "sqlite":
+        if cfg.ticket_store_path:
+            support_store.DB_PATH = Path(cfg.ticket_store_path)
+        return None
+    return build_ticket_store(cfg.ticket_store_backend, path=cfg.ticket_store_path, shards=cfg.ticket_store_shards)
@@ -0,0 +1,48 @@
+"""Tests for the async ticket store and its DB thread."""
+
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+from src.main import support_store
+from src.main.async_support_store import AsyncTicketStore
+from tests.test_support_store import StoreTestCase
+
+
+class AsyncTicketStoreTests(StoreTestCase):
+    def test_operations_run_in_submission_order(self) -> None:
+        async def run() -> list:
+            store = AsyncTicketStore()
+            try:
+                return await asyncio.gather(
+                    store.get_ticket_status("100001"),
+                    store.create_ticket("100001", "card lost"),
+                    store.get_ticket_status("100001"),
+                    store.create_ticket("100001", "duplicate"),
+                    return_exceptions=True,
+                )
+            finally:
+                await store.close()
+
+        before, created, after, duplicate = asyncio.run(run())
+        self.assertIsNone(before)
+        self.assertIsNone(created)
+        self.assertEqual(after, ("Unresolved", None))
+        self.assertIsInstance(duplicate, Exception)
+
+    def test_concurrent_creates_are_all_committed(self) -> None:
+        async def run() -> None:
+            store = AsyncTicketStore()
+            try:
+                numbers = await asyncio.gather(*(store.allocate_ticket_number() for _ in range(20)))
+                await asyncio.gather(*(store.create_ticket(number, "fee") for number in numbers))
+            finally:
+                await store.close()
+
+        asyncio.run(run())
+        self.assertEqual(support_store.count_tickets_by_status(), {"Unresolved": 20})
+
+
+if __name__ == "__main__":
+    unittest.main()
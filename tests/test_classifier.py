@@ -0,0 +1,143 @@
+"""Tests for classifier parsing, fallbacks and the response cache in front of `classify`."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.main import rate_limiter
+from src.main.classifier import ClassificationLabel, classify, normalize_name, triage, triage_result_from_content
+from src.main.rate_limiter import RateLimiter
+from src.main.response_cache import ResponseCache
+
+
+class _Client:
+    """Fake OpenAI client that answers every completion with `payload` as JSON."""
+
+    def __init__(self, payload: dict):
+        self.content = json.dumps(payload)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        self.calls += 1
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def _broken_client() -> SimpleNamespace:
+    def create(**request):
+        raise RuntimeError("model unavailable")
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+class TriageTests(unittest.TestCase):
+    def test_label_name_and_ticket_are_normalized(self) -> None:
+        client = _Client({"label": "Negative", "rationale": "late card", "name": " Ana ", "ticket_number": "#381581"})
+        result = triage("Ana here, ticket 381581 is late", client=client, trace_id="t1")
+        self.assertEqual(result.label, ClassificationLabel.NEGATIVE_FEEDBACK)
+        self.assertEqual(result.customer_name, "Ana")
+        self.assertEqual(result.ticket_number, "381581")
+        self.assertTrue(result.rationale.endswith("trace_id=t1"))
+
+    def test_invalid_ticket_and_placeholder_name_are_dropped(self) -> None:
+        client = _Client({"label": "query", "name": "null", "ticket_number": 12345})
+        result = triage("where is my ticket", client=client)
+        self.assertEqual(result.label, ClassificationLabel.QUERY)
+        self.assertIsNone(result.customer_name)
+        self.assertIsNone(result.ticket_number)
+
+    def test_model_failure_falls_back_to_query(self) -> None:
+        result = triage("where is my ticket", client=_broken_client())
+        self.assertEqual(result.label, ClassificationLabel.QUERY)
+        self.assertIn("Classifier unavailable", result.rationale)
+
+    def test_bad_batch_content_falls_back_to_query(self) -> None:
+        for content in (None, "not json", "[1, 2]"):
+            result = triage_result_from_content(content)
+            self.assertEqual(result.label, ClassificationLabel.QUERY)
+            self.assertIn("Classifier unavailable", result.rationale)
+
+    def test_normalize_name(self) -> None:
+        self.assertIsNone(normalize_name(" None "))
+        self.assertIsNone(normalize_name(""))
+        self.assertEqual(normalize_name("John"), "John")
+
+
+class _Local:
+    """Fake `LocalClassifier` that always predicts positive feedback with `confidence`."""
+
+    confidence_threshold = 0.5
+
+    def __init__(self, confidence: float):
+        self.confidence = confidence
+
+    def predict(self, text: str) -> tuple[ClassificationLabel, float]:
+        return ClassificationLabel.POSITIVE_FEEDBACK, self.confidence
+
+
+class BackendTests(unittest.TestCase):
+    def test_confident_local_prediction_skips_the_model(self) -> None:
+        client = _Client({"label": "query"})
+        result = classify("The app looks different today", client=client, backend="cascade", local_classifier=_Local(0.9))
+        self.assertEqual((result.label, result.confidence), (ClassificationLabel.POSITIVE_FEEDBACK, 0.9))
+        self.assertEqual(client.calls, 0)
+
+    def test_unsure_cascade_falls_through_to_the_model(self) -> None:
+        client = _Client({"label": "query"})
+        result = classify("The app looks different today", client=client, backend="cascade", local_classifier=_Local(0.2))
+        self.assertEqual(result.label, ClassificationLabel.QUERY)
+        self.assertEqual(client.calls, 1)
+
+    def test_local_backend_requires_a_classifier(self) -> None:
+        with self.assertRaises(ValueError):
+            classify("The app looks different today", backend="local")
+
+
+class ResponseCacheTests(unittest.TestCase):
+    MESSAGE = "Why was I charged twice for the same purchase"
+
+    def setUp(self) -> None:
+        rate_limiter.set_rate_limiter(RateLimiter(rpm=0, tpm=0))
+        self.addCleanup(rate_limiter.set_rate_limiter, None)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "rc.db"
+
+    def _cache(self) -> ResponseCache:
+        cache = ResponseCache(sqlite_path=self.path)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_repeated_message_is_served_from_cache(self) -> None:
+        cache = self._cache()
+        client = _Client({"label": "query", "rationale": "asks about a charge"})
+        first = classify(self.MESSAGE, client=client, cache=cache, trace_id="a")
+        second = classify(self.MESSAGE, client=client, cache=cache, trace_id="b")
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(second.label, first.label)
+        self.assertTrue(second.rationale.endswith("trace_id=b"))
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 1))
+
+    def test_sqlite_tier_is_consulted_after_a_restart(self) -> None:
+        classify(self.MESSAGE, client=_Client({"label": "query"}), cache=self._cache())
+        reopened = self._cache()  # empty memory tier, so len(reopened) == 0
+        client = _Client({"label": "positive"})
+        result = classify(self.MESSAGE, client=client, cache=reopened)
+        self.assertEqual(client.calls, 0)
+        self.assertEqual(result.label, ClassificationLabel.QUERY)
+        self.assertEqual(reopened.stats.sqlite_hits, 1)
+
+    def test_fallback_results_are_not_cached(self) -> None:
+        cache = self._cache()
+        classify(self.MESSAGE, client=_broken_client(), cache=cache)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats.misses, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
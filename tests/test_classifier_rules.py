@@ -0,0 +1,69 @@
+"""Tests for the deterministic pre-classifier rules."""
+
+from __future__ import annotations
+
+import unittest
+
+from src.main.classifier import DEFAULT_RULE_THRESHOLD, ClassificationLabel, classify, classify_by_rules
+from src.main.classifier_rules import match_rules, reset_rule_stats, rule_stats
+
+
+class MatchRulesTests(unittest.TestCase):
+    def assertRuled(self, message: str, label: ClassificationLabel) -> None:
+        result = classify_by_rules(message)
+        self.assertIsNotNone(result, message)
+        self.assertEqual(result.label, label, message)
+
+    def assertLeftToModel(self, message: str) -> None:
+        self.assertIsNone(classify_by_rules(message), message)
+
+    def test_unambiguous_messages_skip_the_model(self) -> None:
+        self.assertRuled("Could you check the status of ticket 381581?", ClassificationLabel.QUERY)
+        self.assertRuled("Any update on the progress of 381581?", ClassificationLabel.QUERY)
+        self.assertRuled("Thank you so much!", ClassificationLabel.POSITIVE_FEEDBACK)
+        self.assertRuled("My debit card replacement still hasn't arrived.", ClassificationLabel.NEGATIVE_FEEDBACK)
+
+    def test_status_words_in_statements_or_complaints_are_left_to_the_model(self) -> None:
+        self.assertLeftToModel("Please close ticket 123456, the progress bar in the app is fixed")
+        self.assertLeftToModel("The status of ticket 123456 has not changed in a month, I want to complain")
+        self.assertLeftToModel("Ticket 381581 is still open after 3 weeks, check it")
+        self.assertLeftToModel("What is the status of 381581?\nThis is ridiculous.")
+
+    def test_negated_or_hypothetical_sentiment_is_left_to_the_model(self) -> None:
+        self.assertLeftToModel("Not disappointed at all, the new card came quickly.")
+        self.assertLeftToModel("I was worried it would be terrible, but the card arrived today. Cheers!")
+        self.assertIsNone(match_rules("Not disappointed at all, the new card came quickly."))
+
+    def test_conflicting_labels_are_ambiguous(self) -> None:
+        reset_rule_stats()
+        self.assertIsNone(match_rules("Great app, but the fee is unacceptable"))
+        self.assertEqual(rule_stats()["<ambiguous>"], 1)
+
+    def test_weak_matches_stay_below_the_default_threshold(self) -> None:
+        match = match_rules("The service was terrible")
+        self.assertEqual(match.label, ClassificationLabel.NEGATIVE_FEEDBACK)
+        self.assertLess(match.confidence, DEFAULT_RULE_THRESHOLD)
+
+
+class RuleStatsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        reset_rule_stats()
+
+    def test_classify_counts_each_rule_once(self) -> None:
+        classify("Thanks!")
+        self.assertEqual(rule_stats(), {"thanks_only": 1})
+
+    def test_classify_can_skip_rules(self) -> None:
+        classify("Thanks!", backend="local", local_classifier=_Local(), rule_threshold=None)
+        self.assertEqual(rule_stats(), {})
+
+
+class _Local:
+    confidence_threshold = 0.5
+
+    def predict(self, text: str) -> tuple[ClassificationLabel, float]:
+        return ClassificationLabel.POSITIVE_FEEDBACK, 0.9
+
+
+if __name__ == "__main__":
+    unittest.main()
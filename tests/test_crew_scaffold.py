@@ -0,0 +1,160 @@
+"""Tests for message dispatch in the CrewAI scaffold (no network: model clients are fakes)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+from src.main import crew_scaffold, rate_limiter  # noqa: E402
+from src.main.classifier import ClassificationLabel, ClassificationResult  # noqa: E402
+from src.main.classifier_rules import reset_rule_stats, rule_stats  # noqa: E402
+from src.main.rate_limiter import RateLimiter  # noqa: E402
+from src.main.support_store import TicketNumbersExhausted  # noqa: E402
+from src.main.ticket_store import InMemoryTicketStore, set_ticket_store  # noqa: E402
+
+
+class _JsonClient:
+    """Fake OpenAI client answering every completion with `payload` as JSON."""
+
+    def __init__(self, payload: dict):
+        self.content = json.dumps(payload)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        self.calls += 1
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+class ScaffoldTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        rate_limiter.set_rate_limiter(RateLimiter(rpm=0, tpm=0))
+        self.addCleanup(rate_limiter.set_rate_limiter, None)
+        reset_rule_stats()
+        for name in ("get_openai_client", "get_async_openai_client"):  # agents' LLMs, never called here
+            patcher = mock.patch.object(crew_scaffold, name, return_value=_JsonClient({}))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class RuleDispatchTests(ScaffoldTestCase):
+    def test_confident_feedback_rule_is_counted_once_without_combined_triage(self) -> None:
+        with mock.patch.object(crew_scaffold, "_extract_customer_name", return_value="Ana"):
+            classification, name = crew_scaffold._classify_for_dispatch(
+                "My debit card replacement still hasn't arrived.", None, "m", combined_triage=False
+            )
+        self.assertEqual(classification.label, ClassificationLabel.NEGATIVE_FEEDBACK)
+        self.assertEqual(name, "Ana")
+        self.assertEqual(rule_stats(), {"not_arrived": 1})
+
+    def test_rules_are_counted_once_when_classify_calls_the_model(self) -> None:
+        client = _JsonClient({"label": "negative", "rationale": "unhappy"})
+        with mock.patch("src.main.classifier.get_openai_client", return_value=client), mock.patch.object(
+            crew_scaffold, "_extract_customer_name", return_value=None
+        ):
+            classification, _ = crew_scaffold._classify_for_dispatch(
+                "The service was terrible", None, "m", combined_triage=False
+            )
+        self.assertEqual(classification.label, ClassificationLabel.NEGATIVE_FEEDBACK)
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(rule_stats(), {"complaint": 1})
+
+    def test_confident_query_skips_triage(self) -> None:
+        with mock.patch.object(crew_scaffold, "triage") as triage:
+            classification, name = crew_scaffold._classify_for_dispatch(
+                "Could you check the status of ticket 381581?", "t1", "m", combined_triage=True
+            )
+        triage.assert_not_called()
+        self.assertEqual(classification.label, ClassificationLabel.QUERY)
+        self.assertIn("trace_id=t1", classification.rationale)
+        self.assertIsNone(name)
+
+
+class TicketDispatchTests(ScaffoldTestCase):
+    NEGATIVE = ClassificationResult(label=ClassificationLabel.NEGATIVE_FEEDBACK)
+
+    def test_negative_feedback_creates_a_ticket(self) -> None:
+        with mock.patch.object(crew_scaffold, "_generate_ticket_number", return_value="123456"), mock.patch.object(
+            crew_scaffold, "create_ticket"
+        ) as create:
+            _, task = crew_scaffold._dispatch("Card never came", self.NEGATIVE, "Ana", None, "m")
+        create.assert_called_once_with("123456", "Card never came", status="Unresolved", customer_name="Ana")
+        self.assertIn("Ticket number: 123456", task.description)
+
+    def test_exhausted_ticket_numbers_still_produce_a_reply(self) -> None:
+        with mock.patch.object(
+            crew_scaffold, "_generate_ticket_number", side_effect=TicketNumbersExhausted("full")
+        ), mock.patch.object(crew_scaffold, "create_ticket") as create:
+            _, task = crew_scaffold._dispatch("Card never came", self.NEGATIVE, None, None, "m")
+        create.assert_not_called()
+        self.assertIn("No ticket could be created", task.description)
+
+
+class _StreamingClient:
+    """Fake OpenAI client that streams `deltas` and records each request."""
+
+    def __init__(self, *deltas: str, is_async: bool = False):
+        self.deltas = deltas
+        self.requests: list[dict] = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.acreate if is_async else self.create))
+
+    def create(self, **request):
+        self.requests.append(request)
+        return iter([_delta_chunk(delta) for delta in self.deltas])
+
+    async def acreate(self, **request):
+        self.requests.append(request)
+
+        async def chunks():
+            for delta in self.deltas:
+                yield _delta_chunk(delta)
+
+        return chunks()
+
+
+def _delta_chunk(text: str) -> SimpleNamespace:
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+
+
+class StreamTests(ScaffoldTestCase):
+    MESSAGE = "Could you check the status of ticket 381581?"
+
+    def setUp(self) -> None:
+        super().setUp()
+        store = InMemoryTicketStore()
+        store.create_ticket("381581", "card lost", status="Resolved", customer_name="Ana")
+        set_ticket_store(store)
+        self.addCleanup(set_ticket_store, None)
+
+    def test_reply_is_streamed_from_the_chosen_agent(self) -> None:
+        client = _StreamingClient("Ticket 381581 ", "is resolved.")
+        with mock.patch.object(crew_scaffold, "get_openai_client", return_value=client):
+            deltas = list(crew_scaffold.handle_message_stream(self.MESSAGE, trace_id="t1"))
+        self.assertEqual(deltas, ["Ticket 381581 ", "is resolved."])
+        (request,) = client.requests
+        self.assertTrue(request["stream"])
+        system, user = request["messages"]
+        self.assertIn("Query Handler", system["content"])
+        self.assertIn("Ticket 381581 status: Resolved", user["content"])
+
+    def test_async_reply_is_streamed(self) -> None:
+        client = _StreamingClient("Resolved", "!", is_async=True)
+
+        async def run() -> list[str]:
+            return [delta async for delta in crew_scaffold.ahandle_message_stream(self.MESSAGE)]
+
+        with mock.patch.object(crew_scaffold, "get_async_openai_client", return_value=client):
+            self.assertEqual(asyncio.run(run()), ["Resolved", "!"])
+        self.assertIn("Ticket 381581 status: Resolved", client.requests[0]["messages"][1]["content"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Tests for building the shared OpenAI clients: config, `ClientPool` routing and circuit-breaker state."""
+
+from __future__ import annotations
+
+import time
+import unittest
+
+import httpx
+from openai import APIConnectionError, BadRequestError
+
+from src.main.config import AppConfig
+from src.main.openai_client_factory import ClientPool, Endpoint, _http_client_kwargs, _resolve_config
+
+_REQUEST = httpx.Request("POST", "https://api.test/v1/chat/completions")
+
+
+def _pool(*names: str, failure_threshold: int = 2, cooldown: float = 0.05) -> ClientPool:
+    # Endpoints build their clients lazily, so no config is needed to exercise routing.
+    return ClientPool([Endpoint(name, cfg=None) for name in names], failure_threshold=failure_threshold, cooldown=cooldown)
+
+
+def _fail(pool: ClientPool, error: Exception) -> str:
+    try:
+        with pool.acquire() as endpoint:
+            raise error
+    except type(error):
+        return endpoint.name
+
+
+class ClientConfigTests(unittest.TestCase):
+    def test_explicit_base_url_overrides_config(self) -> None:
+        config = AppConfig(openai_api_key="sk-config", openai_base_url="https://config.test/v1")
+        cfg = _resolve_config(None, "https://gateway.test/v1", config, "get_openai_client")
+        self.assertEqual((cfg.openai_api_key, cfg.openai_base_url), ("sk-config", "https://gateway.test/v1"))
+
+    def test_missing_api_key_is_reported(self) -> None:
+        with self.assertRaises(EnvironmentError):
+            _resolve_config(None, None, AppConfig(openai_api_key=""), "get_openai_client")
+
+    def test_pool_and_timeouts_come_from_config(self) -> None:
+        cfg = AppConfig(openai_api_key="sk", openai_max_connections=7, openai_read_timeout=12.0)
+        kwargs = _http_client_kwargs(cfg)
+        self.assertEqual(kwargs["limits"].max_connections, 7)
+        self.assertEqual((kwargs["timeout"].read, kwargs["timeout"].connect), (12.0, cfg.openai_connect_timeout))
+
+
+class BreakerTests(unittest.TestCase):
+    def test_endpoint_is_ejected_after_consecutive_failures_and_recovers(self) -> None:
+        pool = _pool("a", failure_threshold=2)
+        for _ in range(2):
+            _fail(pool, APIConnectionError(request=_REQUEST))
+        self.assertEqual(pool.stats()["a"]["state"], "open")
+        time.sleep(0.06)
+        self.assertEqual(pool.stats()["a"]["state"], "half-open")
+        with pool.acquire():
+            pass
+        self.assertEqual(pool.stats()["a"]["state"], "closed")
+
+    def test_failed_probe_reopens_immediately(self) -> None:
+        pool = _pool("a", failure_threshold=1)
+        _fail(pool, APIConnectionError(request=_REQUEST))
+        time.sleep(0.06)
+        _fail(pool, APIConnectionError(request=_REQUEST))
+        self.assertEqual(pool.stats()["a"]["state"], "open")
+        self.assertEqual(pool.stats()["a"]["times_opened"], 2)
+
+    def test_client_errors_do_not_count_against_the_endpoint(self) -> None:
+        pool = _pool("a", failure_threshold=1)
+        response = httpx.Response(400, request=_REQUEST)
+        _fail(pool, BadRequestError("bad request", response=response, body=None))
+        self.assertEqual(pool.stats()["a"]["state"], "closed")
+
+    def test_open_endpoint_is_skipped(self) -> None:
+        pool = _pool("a", "b", failure_threshold=1, cooldown=60)
+        while _fail(pool, APIConnectionError(request=_REQUEST)) != "a":
+            pass
+        for _ in range(5):
+            with pool.acquire() as endpoint:
+                self.assertEqual(endpoint.name, "b")
+
+
+class RoutingTests(unittest.TestCase):
+    def test_faster_endpoint_gets_the_next_request(self) -> None:
+        pool = _pool("slow", "fast")
+        pool.endpoints[0].ewma_latency = 0.5
+        pool.endpoints[1].ewma_latency = 0.05
+        with pool.acquire() as endpoint:
+            self.assertEqual(endpoint.name, "fast")
+
+    def test_unmeasured_endpoint_is_tried(self) -> None:
+        pool = _pool("measured", "new")
+        pool.endpoints[0].ewma_latency = 0.05
+        with pool.acquire() as endpoint:
+            self.assertEqual(endpoint.name, "new")
+
+
+if __name__ == "__main__":
+    unittest.main()
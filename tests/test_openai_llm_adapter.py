@@ -0,0 +1,281 @@
+"""Tests for `OpenAIChatLLM`: retry classification, hedging and streaming."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+import httpx
+from openai import APIConnectionError, BadRequestError, InternalServerError, RateLimitError
+
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+from src.main import openai_llm_adapter, rate_limiter  # noqa: E402
+from src.main.openai_llm_adapter import HEDGE_MIN_SAMPLES, OpenAIChatLLM, llm_call_stats, reset_llm_call_stats  # noqa: E402
+from src.main.rate_limiter import RateLimiter  # noqa: E402
+
+_REQUEST = httpx.Request("POST", "https://api.test/v1/chat/completions")
+
+
+def _connection_error() -> APIConnectionError:
+    return APIConnectionError(request=_REQUEST)
+
+
+def _status_error(cls, status: int, **headers):
+    return cls("error", response=httpx.Response(status, request=_REQUEST, headers=headers), body=None)
+
+
+def _completion(text: str) -> SimpleNamespace:
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))], usage=None)
+
+
+def _chunk(text=None, *, total_tokens=None) -> SimpleNamespace:
+    if total_tokens is not None:  # the final include_usage chunk has no choices
+        return SimpleNamespace(choices=[], usage=SimpleNamespace(total_tokens=total_tokens))
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+
+
+class _Stream:
+    """Fake `openai.Stream`: one persistent iterator; exceptions in `items` are raised in place."""
+
+    def __init__(self, *items):
+        self._items = iter(items)
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self._items)
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return self.__next__()
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+    def close(self):
+        self.closed = True
+
+
+class _AsyncStream(_Stream):
+    async def close(self):  # AsyncStream.close is a coroutine
+        self.closed = True
+
+
+class _Client:
+    """Fake OpenAI client; each call pops the next outcome: a value, an exception, or a callable."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _next(self):
+        with self._lock:
+            self.calls += 1
+            return self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+
+    def create(self, **request):
+        outcome = self._next()
+        if callable(outcome):
+            outcome = outcome()
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+class _AsyncClient(_Client):
+    async def create(self, **request):
+        outcome = self._next()
+        if callable(outcome):
+            outcome = await outcome()
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+class AdapterTestCase(unittest.TestCase):
+    MODEL = "test-model"
+
+    def setUp(self) -> None:
+        self.limiter = RateLimiter(rpm=0, tpm=0)
+        rate_limiter.set_rate_limiter(self.limiter)
+        self.addCleanup(rate_limiter.set_rate_limiter, None)
+        reset_llm_call_stats()
+
+    def llm(self, client=None, async_client=None, **options) -> OpenAIChatLLM:
+        options.setdefault("backoff_base", 0.0)
+        return OpenAIChatLLM(client=client, model=self.MODEL, async_client=async_client, **options)
+
+    def stats(self) -> dict:
+        return llm_call_stats()[self.MODEL]
+
+    def seed_attempt_latency(self, seconds: float) -> None:
+        """Give the model enough attempt history for hedging to kick in."""
+        stats = openai_llm_adapter._stats_for(self.MODEL)
+        for _ in range(HEDGE_MIN_SAMPLES):
+            stats.record_attempt(seconds)
+
+
+class RetryTests(AdapterTestCase):
+    def test_transient_errors_are_retried_up_to_max_retries(self) -> None:
+        client = _Client(_connection_error())
+        with self.assertRaises(APIConnectionError):
+            self.llm(client, max_retries=2).call("hi")
+        self.assertEqual(client.calls, 3)
+        self.assertEqual((self.stats()["retries"], self.stats()["errors"]), (2, 1))
+
+    def test_server_error_then_success(self) -> None:
+        client = _Client(_status_error(InternalServerError, 503), _completion("ok"))
+        self.assertEqual(self.llm(client).call("hi"), "ok")
+        self.assertEqual(client.calls, 2)
+
+    def test_client_errors_are_not_retried(self) -> None:
+        client = _Client(_status_error(BadRequestError, 400))
+        with self.assertRaises(BadRequestError):
+            self.llm(client, max_retries=2).call("hi")
+        self.assertEqual(client.calls, 1)
+
+    def test_rate_limits_are_left_to_the_limiter(self) -> None:
+        client = _Client(_status_error(RateLimitError, 429, **{"retry-after": "0"}))
+        with self.assertRaises(RateLimitError):
+            self.llm(client, max_retries=2).call("hi")
+        # Only the limiter's retries, not multiplied by the adapter's.
+        self.assertEqual(client.calls, rate_limiter.RATE_LIMIT_RETRIES + 1)
+        self.assertEqual(self.stats()["retries"], 0)
+
+    def test_backoff_is_capped_full_jitter(self) -> None:
+        llm = self.llm(_Client(_completion("")), backoff_base=0.5, backoff_max=2.0)
+        with mock.patch.object(openai_llm_adapter.random, "uniform", side_effect=lambda low, high: high):
+            self.assertEqual([llm._backoff(attempt) for attempt in range(4)], [0.5, 1.0, 2.0, 2.0])
+
+    def test_async_transient_errors_are_retried(self) -> None:
+        client = _AsyncClient(_connection_error(), _completion("ok"))
+        self.assertEqual(asyncio.run(self.llm(async_client=client).acall("hi")), "ok")
+        self.assertEqual(client.calls, 2)
+
+
+class HedgeTests(AdapterTestCase):
+    def test_no_hedge_without_latency_history(self) -> None:
+        client = _Client(_completion("ok"))
+        self.assertEqual(self.llm(client, hedge=True).call("hi"), "ok")
+        self.assertEqual(self.stats()["hedges"], 0)
+
+    def test_hedge_answers_when_the_primary_is_slow(self) -> None:
+        self.seed_attempt_latency(0.01)
+        client = _Client(lambda: (time.sleep(0.3), _completion("slow"))[1], _completion("fast"))
+        self.assertEqual(self.llm(client, hedge=True).call("hi"), "fast")
+        self.assertEqual((self.stats()["hedges"], self.stats()["hedge_wins"]), (1, 1))
+
+    def test_queued_hedge_is_dropped_when_the_primary_answers(self) -> None:
+        self.seed_attempt_latency(0.01)
+        pool = ThreadPoolExecutor(max_workers=1)
+        release = threading.Event()
+        pool.submit(release.wait)  # the only worker is busy, so the hedge stays queued
+        client = _Client(lambda: (time.sleep(0.1), _completion("primary"))[1])
+        with mock.patch.object(openai_llm_adapter, "_HEDGE_POOL", pool):
+            self.assertEqual(self.llm(client, hedge=True).call("hi"), "primary")
+        release.set()
+        pool.shutdown(wait=True)
+        self.assertEqual(client.calls, 1)
+        self.assertEqual((self.stats()["hedges"], self.stats()["hedge_wins"]), (1, 0))
+
+    def test_failed_primary_falls_back_to_the_hedge(self) -> None:
+        self.seed_attempt_latency(0.01)
+        client = _Client(
+            lambda: (time.sleep(0.05), _status_error(BadRequestError, 400))[1],
+            lambda: (time.sleep(0.15), _completion("hedge"))[1],
+        )
+        self.assertEqual(self.llm(client, hedge=True, max_retries=0).call("hi"), "hedge")
+
+    def test_async_hedge_cancels_the_losing_primary(self) -> None:
+        self.seed_attempt_latency(0.01)
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return _completion("slow")
+
+        async def fast():
+            return _completion("fast")
+
+        client = _AsyncClient(slow, fast)
+
+        async def run() -> str:
+            reply = await self.llm(async_client=client, hedge=True).acall("hi")
+            await asyncio.sleep(0)  # let the cancellation land
+            return reply
+
+        self.assertEqual(asyncio.run(run()), "fast")
+        self.assertEqual(cancelled, [True])
+        self.assertEqual(self.stats()["hedge_wins"], 1)
+
+
+class StreamTests(AdapterTestCase):
+    def test_failure_before_the_first_delta_is_retried(self) -> None:
+        broken = _Stream(_chunk(""), _connection_error())  # headers and a role-only chunk, then a drop
+        client = _Client(broken, _Stream(_chunk("Hel"), _chunk("lo"), _chunk(total_tokens=12)))
+        self.assertEqual(list(self.llm(client).stream_call("hi")), ["Hel", "lo"])
+        self.assertTrue(broken.closed)
+        stats = self.stats()
+        self.assertEqual((stats["retries"], stats["errors"], stats["calls"]), (1, 0, 1))
+        self.assertGreater(stats["ttft_p50_ms"], 0)
+        self.assertEqual(self.limiter.stats()[self.MODEL]["tokens_used"], 12)
+
+    def test_failure_after_text_is_raised_not_replayed(self) -> None:
+        client = _Client(_Stream(_chunk("Hel"), _connection_error()))
+        received = []
+        with self.assertRaises(APIConnectionError):
+            for delta in self.llm(client).stream_call("hi"):
+                received.append(delta)
+        self.assertEqual(received, ["Hel"])
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(self.stats()["errors"], 1)
+
+    def test_failed_attempt_refunds_its_token_reservation(self) -> None:
+        limiter = RateLimiter(rpm=0, tpm=6000)  # 100 tokens/s, bucket of 1000
+        rate_limiter.set_rate_limiter(limiter)
+        client = _Client(_Stream(_connection_error()))
+        with self.assertRaises(APIConnectionError):
+            list(self.llm(client, max_retries=0).stream_call("hi"))
+        bucket = limiter._models[self.MODEL].tokens
+        bucket.refill(time.monotonic())
+        self.assertAlmostEqual(bucket.level, bucket.capacity, delta=1)
+
+    def test_call_joins_a_streamed_reply(self) -> None:
+        client = _Client(_Stream(_chunk("a"), _chunk("b")))
+        self.assertEqual(self.llm(client, stream=True).call("hi"), "ab")
+
+    def test_async_failure_before_the_first_delta_is_retried(self) -> None:
+        broken = _AsyncStream(_connection_error())
+        client = _AsyncClient(broken, _AsyncStream(_chunk("Hi"), _chunk("!")))
+
+        async def run() -> list[str]:
+            return [delta async for delta in self.llm(async_client=client).astream_call("hi")]
+
+        self.assertEqual(asyncio.run(run()), ["Hi", "!"])
+        self.assertTrue(broken.closed)
+        self.assertEqual(self.stats()["retries"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""Tests for the per-model rate limiter: priority lanes and 429 handling."""
+
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+import httpx
+from openai import APIConnectionError, RateLimitError
+
+from src.main import rate_limiter
+from src.main.rate_limiter import RateLimiter, limited_completion
+
+REQUEST = {"model": "m", "messages": [{"role": "user", "content": "hello"}], "max_tokens": 10}
+
+
+def _rate_limit_error() -> RateLimitError:
+    request = httpx.Request("POST", "https://api.test/v1/chat/completions")
+    response = httpx.Response(429, request=request, headers={"retry-after": "0.01"})
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+class _Client:
+    """Fake OpenAI client whose completions raise the queued errors, then succeed."""
+
+    def __init__(self, *errors: Exception):
+        self.errors = list(errors)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return SimpleNamespace(usage=SimpleNamespace(total_tokens=12))
+
+
+class PriorityLaneTests(unittest.TestCase):
+    def test_interactive_waiter_goes_before_earlier_batch_waiter(self) -> None:
+        limiter = RateLimiter(rpm=0, tpm=0)
+        limiter.pause("m", 0.2)
+        order: list[str] = []
+
+        def acquire(priority: str) -> None:
+            limiter.acquire("m", 1, priority=priority)
+            order.append(priority)
+
+        batch = threading.Thread(target=acquire, args=("batch",))
+        batch.start()
+        time.sleep(0.05)  # the batch caller is queued first
+        interactive = threading.Thread(target=acquire, args=("interactive",))
+        interactive.start()
+        batch.join()
+        interactive.join()
+        self.assertEqual(order, ["interactive", "batch"])
+
+    def test_requests_beyond_the_burst_wait(self) -> None:
+        limiter = RateLimiter(rpm=600, tpm=0)  # 10/s, bucket of 100
+        for _ in range(100):
+            limiter.acquire("m", 1)
+        with self.assertRaises(rate_limiter.RateLimitTimeout):
+            limiter.acquire("m", 1, timeout=0.01)
+        limiter.acquire("m", 1, timeout=1.0)
+        self.assertEqual(limiter.stats()["m"]["throttled"], 1)
+
+    def test_unknown_priority_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            RateLimiter().acquire("m", 1, priority="urgent")
+
+
+class LimitedCompletionTests(unittest.TestCase):
+    def test_429_pauses_and_retries(self) -> None:
+        limiter = RateLimiter(rpm=0, tpm=0)
+        client = _Client(_rate_limit_error())
+        limited_completion(client, REQUEST, limiter=limiter)
+        self.assertEqual(client.calls, 2)
+        self.assertEqual(limiter.stats()["m"]["rate_limit_errors"], 1)
+
+    def test_429_retries_are_bounded(self) -> None:
+        limiter = RateLimiter(rpm=0, tpm=0)
+        client = _Client(*[_rate_limit_error() for _ in range(rate_limiter.RATE_LIMIT_RETRIES + 1)])
+        with self.assertRaises(RateLimitError):
+            limited_completion(client, REQUEST, limiter=limiter)
+        self.assertEqual(client.calls, rate_limiter.RATE_LIMIT_RETRIES + 1)
+
+    def test_other_errors_refund_the_token_reservation(self) -> None:
+        limiter = RateLimiter(rpm=0, tpm=6000)  # 100 tokens/s, bucket of 1000
+        error = APIConnectionError(request=httpx.Request("POST", "https://api.test"))
+        with self.assertRaises(APIConnectionError):
+            limited_completion(_Client(error), REQUEST, limiter=limiter)
+        bucket = limiter._models["m"].tokens
+        bucket.refill(time.monotonic())
+        self.assertAlmostEqual(bucket.level, bucket.capacity, delta=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,219 @@
+"""Tests for the SQLite ticket store."""
+
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from src.main import support_store
+from src.main.ticket_store import set_ticket_store
+
+
+class StoreTestCase(unittest.TestCase):
+    """Points `DB_PATH` at a fresh database and the facade at plain SQLite."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.original_path = support_store.DB_PATH
+        support_store.DB_PATH = Path(tmp.name) / "support.db"
+        set_ticket_store(None)
+        support_store.clear_status_cache()
+
+    def tearDown(self) -> None:
+        support_store.disable_write_behind()
+        support_store.close_connections()
+        support_store.DB_PATH = self.original_path
+
+
+class ConnectionPoolTests(StoreTestCase):
+    def test_connections_of_finished_threads_are_closed(self) -> None:
+        support_store.init_db()
+        before = len(support_store._open_connections)
+
+        def read() -> None:
+            support_store.get_ticket_status("100000")
+
+        for _ in range(50):
+            thread = threading.Thread(target=read)
+            thread.start()
+            thread.join()
+        self.assertEqual(len(support_store._open_connections), before)
+
+    def test_close_connections_reconnects_lazily(self) -> None:
+        support_store.create_ticket("100001", "card lost")
+        support_store.close_connections()
+        self.assertEqual(support_store.get_ticket_status("100001"), ("Unresolved", None))
+
+    def test_new_connections_use_wal(self) -> None:
+        (mode,) = support_store._connection().execute("PRAGMA journal_mode").fetchone()
+        self.assertEqual(mode, "wal")
+
+
+class MigrationTests(StoreTestCase):
+    def test_schema_is_created_on_first_connection(self) -> None:
+        support_store.create_ticket("100001", "card lost")  # no init_db()
+        (version,) = support_store._connection().execute("SELECT MAX(version) FROM schema_version").fetchone()
+        self.assertEqual(version, support_store._MIGRATIONS[-1][0])
+        support_store.init_db()  # still idempotent
+        self.assertEqual(support_store.get_ticket_status("100001"), ("Unresolved", None))
+
+
+class WriteBehindTests(StoreTestCase):
+    def _committed_rows(self) -> int:
+        with sqlite3.connect(support_store.DB_PATH) as conn:  # bypasses the queue
+            return conn.execute("SELECT COUNT(*) FROM support_tickets").fetchone()[0]
+
+    def test_flush_commits_queued_rows(self) -> None:
+        support_store.init_db()
+        support_store.enable_write_behind(max_delay=60)
+        support_store.create_ticket("100001", "card lost")
+        self.assertEqual(self._committed_rows(), 0)
+        support_store.flush()
+        self.assertEqual(self._committed_rows(), 1)
+
+    def test_reads_see_queued_rows(self) -> None:
+        support_store.enable_write_behind(max_delay=60)
+        support_store.create_ticket("100001", "card lost")
+        page = support_store.list_tickets()
+        self.assertEqual([ticket.ticket_number for ticket in page.tickets], ["100001"])
+
+    def test_buffered_failure_is_reported_by_flush_not_by_reads(self) -> None:
+        support_store.create_ticket("100001", "card lost")
+        support_store.enable_write_behind(max_delay=60)
+        support_store.create_ticket("100001", "duplicate")
+        support_store.list_tickets()
+        support_store.count_tickets_by_status()
+        with self.assertRaises(RuntimeError) as caught:
+            support_store.flush()
+        self.assertIsInstance(caught.exception.__cause__, sqlite3.IntegrityError)
+        support_store.flush()  # reported once
+
+    def test_commit_mode_returns_after_the_row_is_committed(self) -> None:
+        support_store.init_db()
+        support_store.enable_write_behind(max_delay=0.01, durability="commit")
+        support_store.create_ticket("100001", "card lost")
+        self.assertEqual(self._committed_rows(), 1)
+
+    def test_commit_mode_failure_goes_to_its_caller_only(self) -> None:
+        support_store.create_ticket("100001", "card lost")
+        support_store.enable_write_behind(max_delay=0.2, durability="commit")
+        stop = threading.Event()
+
+        def flush_repeatedly() -> None:
+            while not stop.wait(0.001):
+                support_store.flush()
+
+        flusher = threading.Thread(target=flush_repeatedly)
+        flusher.start()
+        try:
+            with self.assertRaises(sqlite3.IntegrityError):
+                support_store.create_ticket("100001", "duplicate")
+        finally:
+            stop.set()
+            flusher.join()
+        support_store.create_ticket("100002", "new")
+        self.assertEqual(support_store.get_ticket_status("100002"), ("Unresolved", None))
+
+
+class ListingTests(StoreTestCase):
+    def test_keyset_pages_follow_filters(self) -> None:
+        for number in range(100001, 100006):
+            support_store.create_ticket(str(number), "fee", customer_name="Ana" if number % 2 else "Ben")
+        support_store.update_ticket_status("100005", "Resolved")
+        first = support_store.list_tickets(customer_name="Ana", limit=2)
+        self.assertEqual([ticket.ticket_number for ticket in first.tickets], ["100005", "100003"])
+        second = support_store.list_tickets(customer_name="Ana", limit=2, cursor=first.next_cursor)
+        self.assertEqual([ticket.ticket_number for ticket in second.tickets], ["100001"])
+        self.assertIsNone(second.next_cursor)
+        self.assertEqual(support_store.count_tickets_by_status(), {"Unresolved": 4, "Resolved": 1})
+
+
+class AllocationTests(StoreTestCase):
+    def test_permutation_is_a_bijection_on_six_digit_space(self) -> None:
+        values = {support_store._permute(value, 12345) for value in range(support_store.TICKET_NUMBER_SPACE)}
+        self.assertEqual(len(values), support_store.TICKET_NUMBER_SPACE)
+        self.assertEqual(min(values), 0)
+        self.assertEqual(max(values), support_store.TICKET_NUMBER_SPACE - 1)
+
+    def test_concurrent_allocations_are_unique(self) -> None:
+        numbers: list[str] = []
+        lock = threading.Lock()
+
+        def allocate() -> None:
+            drawn = [support_store.allocate_ticket_number() for _ in range(100)]
+            with lock:
+                numbers.extend(drawn)
+
+        threads = [threading.Thread(target=allocate) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(numbers)), 800)
+        self.assertTrue(all(len(number) == 6 for number in numbers))
+
+    def test_sequence_values_are_not_lost_between_processes(self) -> None:
+        for _ in range(3):
+            support_store.allocate_ticket_number()
+            support_store.close_connections()  # as if the process exited
+        (next_value,) = support_store._connection().execute("SELECT next_value FROM ticket_sequence").fetchone()
+        self.assertEqual(next_value, 3)
+
+    def test_existing_numbers_are_skipped(self) -> None:
+        support_store.init_db()
+        (seed,) = support_store._connection().execute("SELECT seed FROM ticket_sequence").fetchone()
+        taken = str(support_store.TICKET_NUMBER_MIN + support_store._permute(0, seed))  # next number drawn
+        support_store.create_ticket(taken, "imported earlier")
+        self.assertNotEqual(support_store.allocate_ticket_number(), taken)
+
+    def test_exhausted_sequence_raises(self) -> None:
+        support_store.init_db()
+        with support_store._connection() as conn:
+            conn.execute("UPDATE ticket_sequence SET next_value = ?", (support_store.TICKET_NUMBER_SPACE,))
+        with self.assertRaises(support_store.TicketNumbersExhausted):
+            support_store.allocate_ticket_number()
+
+
+class BulkImportTests(StoreTestCase):
+    def test_reads_during_import_do_not_leave_stale_cache(self) -> None:
+        support_store.create_ticket("100001", "card lost")
+
+        def rows():
+            yield ("100001", "Resolved", "card lost", None)
+            support_store.get_ticket_status("100001")  # caches the pre-import value
+            yield ("100002", "Unresolved", "fee", None)
+
+        support_store.import_tickets(rows(), batch_size=10)
+        self.assertEqual(support_store.get_ticket_status("100001"), ("Resolved", None))
+
+    def test_export_import_round_trip(self) -> None:
+        support_store.import_tickets(
+            [("100001", "Unresolved", "debit card replacement", "Ana"), ("100002", "Resolved", "loan fee", None)]
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("tickets.jsonl", "tickets.csv"):
+                path = Path(tmp) / name
+                self.assertEqual(support_store.export_tickets(path).rows, 2)
+                self.assertEqual(support_store.import_tickets(path).rows, 2)
+        self.assertEqual(support_store.get_ticket_status("100001"), ("Unresolved", "Ana"))
+        self.assertEqual(support_store.get_ticket_status("100002"), ("Resolved", None))
+
+    def test_round_trip_keeps_search_index_in_sync(self) -> None:
+        support_store.import_tickets(
+            [("100001", "Unresolved", "debit card replacement", "Ana"), ("100002", "Resolved", "loan fee", None)]
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tickets.jsonl"
+            self.assertEqual(support_store.export_tickets(path).rows, 2)
+            support_store.import_tickets(path)
+        hits = support_store.search_tickets("replace card")
+        self.assertEqual([hit.ticket.ticket_number for hit in hits], ["100001"])
+        self.assertEqual(support_store.count_tickets_by_status(), {"Unresolved": 1, "Resolved": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Tests for the pluggable ticket-store backends."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.main import support_store
+from src.main.ticket_store import InMemoryTicketStore, ShardedTicketStore, set_ticket_store
+
+
+class ShardedTicketStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.addCleanup(support_store.close_connections)
+        self.store = ShardedTicketStore(Path(tmp.name) / "support.db", shards=3)
+        self.numbers = [self.store.allocate_ticket_number() for _ in range(40)]
+        for index, number in enumerate(self.numbers):
+            status = "Resolved" if index % 3 == 0 else "Unresolved"
+            self.store.create_ticket(number, f"message {index}", status=status, customer_name=f"c{index % 2}")
+
+    def _pages(self, limit: int, **filters) -> list[list]:
+        pages, cursor = [], None
+        while True:
+            page = self.store.list_tickets(limit=limit, cursor=cursor, **filters)
+            pages.append(page.tickets)
+            if page.next_cursor is None:
+                return pages
+            cursor = page.next_cursor
+
+    def test_pages_cover_every_ticket_once_in_global_id_order(self) -> None:
+        for limit in (1, 7, 40, 100):
+            tickets = [ticket for page in self._pages(limit) for ticket in page]
+            self.assertCountEqual([ticket.ticket_number for ticket in tickets], self.numbers)
+            ids = [ticket.id for ticket in tickets]
+            self.assertEqual(ids, sorted(ids, reverse=True))
+            self.assertTrue(all(len(page) <= limit for page in self._pages(limit)))
+
+    def test_filtered_pages_match_the_filter(self) -> None:
+        tickets = [ticket for page in self._pages(5, status="Resolved", customer_name="c0") for ticket in page]
+        expected = [n for i, n in enumerate(self.numbers) if i % 3 == 0 and i % 2 == 0]
+        self.assertCountEqual([ticket.ticket_number for ticket in tickets], expected)
+
+    def test_counts_and_routing(self) -> None:
+        self.assertEqual(sum(self.store.count_tickets_by_status().values()), 40)
+        self.assertEqual(len(set(self.numbers)), 40)
+        for number in self.numbers:
+            self.assertIsNotNone(self.store.get_ticket_status(number))
+
+    def test_non_numeric_ticket_numbers_route_to_a_shard(self) -> None:
+        self.assertIsNone(self.store.get_ticket_status("ab1234"))
+        self.store.import_tickets([(f"T{n:09d}", "Unresolved", "imported", None) for n in range(20)])
+        self.assertEqual(self.store.get_ticket_status("T000000007"), ("Unresolved", None))
+        self.assertEqual(sum(self.store.count_tickets_by_status().values()), 60)
+
+
+class InMemoryTicketStoreTests(unittest.TestCase):
+    def test_listed_tickets_are_snapshots(self) -> None:
+        store = InMemoryTicketStore()
+        store.create_ticket("100001", "card lost")
+        (ticket,) = store.list_tickets().tickets
+        store.update_ticket_status("100001", "Resolved")
+        self.assertEqual(ticket.status, "Unresolved")
+        self.assertEqual(store.list_tickets().tickets[0].status, "Resolved")
+
+
+class FacadeBackendTests(unittest.TestCase):
+    def tearDown(self) -> None:
+        set_ticket_store(None)
+
+    def test_import_and_export_use_the_configured_backend(self) -> None:
+        store = InMemoryTicketStore()
+        set_ticket_store(store)
+        support_store.import_tickets([("100001", "Unresolved", "card lost", None), ("100002", "Resolved", "fee", "Ana")])
+        self.assertEqual(store.count_tickets_by_status(), {"Unresolved": 1, "Resolved": 1})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tickets.csv"
+            self.assertEqual(support_store.export_tickets(path).rows, 2)
+            self.assertEqual(len(path.read_text(encoding="utf-8").splitlines()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()